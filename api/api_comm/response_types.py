@@ -22,6 +22,11 @@ class JoinGameResponse(ResponseData):
     game_code: str
     already_joined: bool
 
+class AddBotResponse(ResponseData):
+    game_id: str
+    game_code: str
+    bot_player_id: str
+
 class GetGameStateResponse(ResponseData):
     game_state: str
     players_turn: bool
@@ -31,3 +36,13 @@ class GetGameStateResponse(ResponseData):
 class IncrementCellResponse(ResponseData):
     board_actions: list[dict]
 
+
+class LiveGameStateResponse(GetGameStateResponse):
+    # The game's event stream and the last event the state includes
+    stream: int
+    seq: int
+
+class ResumeGameResponse(ResponseData):
+    stream: int
+    seq: int
+    replayed: int
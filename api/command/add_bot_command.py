@@ -0,0 +1,34 @@
+from .command import Command
+from .join_game_command import JoinGameCommand
+from ..database_access.sql_model.sql_model_database_service import SQLModelDatabaseService
+from ..models.models import Player
+from ..utils.datetime_helper import datetime_now
+
+from sqlmodel import insert
+from uuid import uuid4
+
+
+class AddBotCommand(Command):
+
+    def __init__(self, database_service: SQLModelDatabaseService) -> None:
+        super().__init__()
+        self.database_service = database_service
+
+    def execute(self, game_code: str) -> tuple[str, str]:
+        bot_player_id = self._create_bot_player()
+        game_id, _ = JoinGameCommand(self.database_service).execute(game_code, bot_player_id)
+        return game_id, bot_player_id
+
+    def _create_bot_player(self) -> str:
+        id = str(uuid4())
+        query = insert(Player).values(
+            id=id,
+            name="Bot",
+            # Bots never log in, the address only has to be unique
+            email=f"bot-{id}@bots.chainreaction",
+            is_bot=True,
+            created_at=datetime_now(),
+            modified_at=datetime_now()
+        )
+        self.database_service.execute(query)
+        return id
@@ -0,0 +1,94 @@
+from .command import Command
+from ..database_access.sql_model.sql_model_database_service import SQLModelDatabaseService
+from ..models.models import Game, GameState, GameMove, GameStateArchive
+from ..utils.datetime_helper import datetime_now
+from .game_state_store import GameStateStore
+
+from sqlmodel import select, col, and_, insert, update, delete
+from uuid import uuid4
+import json
+import os
+import zlib
+
+# What happens to the history of a completed game:
+#   "archive": keep it as one compressed GAME_STATE_ARCHIVE row
+#   "drop": discard it
+# Either way only the final board stays in GAME_STATE.
+RETENTION_POLICY = os.environ.get("GAME_STATE_RETENTION", "archive")
+RETENTION_POLICIES = ("archive", "drop")
+
+
+class CompactGameHistoryCommand(Command):
+
+    def __init__(self, database_service: SQLModelDatabaseService, policy: str = RETENTION_POLICY) -> None:
+        super().__init__()
+        if policy not in RETENTION_POLICIES:
+            raise ValueError(f"Unknown retention policy: {policy}")
+        self.database_service = database_service
+        self.policy = policy
+        self.game_state_store = GameStateStore(database_service)
+
+    def execute(self, batch_size: int) -> int:
+        """
+        Compact up to `batch_size` completed games and return how many were compacted.
+        Run inside a unit of work; the games stay locked until it commits.
+        """
+        games = self._get_uncompacted_games(batch_size)
+        for game in games:
+            self._compact(game)
+        return len(games)
+
+    def _compact(self, game: Game) -> None:
+        final_board = self.game_state_store.load(game.id)
+        if self.policy == "archive":
+            self._archive_history(game.id)
+
+        self.database_service.execute_many([
+            delete(GameMove).where(col(GameMove.game_id) == game.id),
+            delete(GameState).where(col(GameState.game_id) == game.id),
+            insert(GameState).values({
+                "id": str(uuid4()),
+                "game_id": game.id,
+                "state": final_board.to_state(),
+                "turn": game.turn_count,
+                "created_at": datetime_now()
+            }),
+            update(Game).where(col(Game.id) == game.id).values({
+                "compacted_at": datetime_now()
+            })
+        ])
+
+    def _archive_history(self, game_id: str) -> None:
+        states = self.database_service.select(
+            select(GameState).where(col(GameState.game_id) == game_id).order_by(col(GameState.created_at))
+        )
+        moves = self.database_service.select(
+            select(GameMove).where(col(GameMove.game_id) == game_id).order_by(col(GameMove.turn))
+        )
+        history = {
+            "states": [[state.turn, state.created_at.isoformat(), state.state] for state in states],
+            "moves": [[move.turn, move.row, move.col, move.color] for move in moves]
+        }
+        stmt = insert(GameStateArchive).values({
+            "game_id": game_id,
+            "history": zlib.compress(json.dumps(history, separators=(",", ":")).encode()),
+            "state_count": len(states),
+            "move_count": len(moves),
+            "created_at": datetime_now()
+        })
+        self.database_service.execute(stmt)
+
+    def _get_uncompacted_games(self, batch_size: int) -> list[Game]:
+        stmt = (
+            select(Game)
+            .where(
+                and_(
+                    col(Game.complete) == True,
+                    col(Game.compacted_at).is_(None)
+                )
+            )
+            .limit(batch_size)
+            # Concurrent compactors take different games instead of waiting on each other
+            .with_for_update(skip_locked=True)
+        )
+        return self.database_service.select(stmt)
@@ -1,10 +1,9 @@
 from .command import Command
 from ..database_access.sql_model.sql_model_database_service import SQLModelDatabaseService
-from ..models.models import Game
 from ..utils.datetime_helper import datetime_now
 from .exceptions.exceptions import GenerateCodeError, BoardDimensionError
+from .statements import SELECT_GAME_CODE, INSERT_GAME
 
-from sqlmodel import insert, select, col, and_
 from uuid import uuid4
 import random
 import string
@@ -32,27 +31,21 @@ class CreateGameCommand(Command):
         
         id = str(uuid4())
         code = self._generate_unique_game_code()
-        query = insert(Game).values(
-            id=id, 
-            code=code,
-            board_width=board_width,
-            board_height=board_height,
-            created_at=datetime_now(),
-            modified_at=datetime_now()
-        )
-        self.database_service.execute(query)
+        self.database_service.execute(INSERT_GAME, {
+            "id": id,
+            "code": code,
+            "board_width": board_width,
+            "board_height": board_height,
+            "created_at": datetime_now(),
+            "modified_at": datetime_now()
+        })
         return id, code
 
     def _generate_unique_game_code(self) -> str:
         generated_code = None
         for _ in range(0, 10):
             temp_code = generate_game_code().upper()
-            stmt = select(col(Game.code)).select_from(Game).where(
-                and_(
-                    col(Game.code) == temp_code
-                )
-            )
-            codes = self.database_service.select(stmt)
+            codes = self.database_service.select(SELECT_GAME_CODE, {"game_code": temp_code})
             if len(codes) == 0:
                 generated_code = temp_code
                 break
@@ -39,6 +39,11 @@ class GenerateCodeError(CommandError):
     status_code = HTTPStatus.INTERNAL_SERVER_ERROR  # 500
 
 
+class GameFullError(CommandError):
+    message = "Game has no seats left."
+    status_code = HTTPStatus.CONFLICT  # 409
+
+
 class GameCompleteError(CommandError):
     message = "Game is already complete."
     status_code = HTTPStatus.CONFLICT  # 409
@@ -68,6 +73,14 @@ class CellIncrementError(CommandError):
     message = "Unable to increment cell."
     status_code = HTTPStatus.BAD_REQUEST  # 400
 
+class PassNotAllowedError(CommandError):
+    message = "Player has a cell they can play, so cannot pass."
+    status_code = HTTPStatus.BAD_REQUEST  # 400
+
+class MoveNotSavedError(CommandError):
+    message = "The move could not be saved."
+    status_code = HTTPStatus.SERVICE_UNAVAILABLE  # 503
+
 class BoardDimensionError(CommandError):
     message = "Board width & hieght must be less than 15."
     status_code = HTTPStatus.BAD_REQUEST  # 400
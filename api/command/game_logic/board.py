@@ -1,8 +1,31 @@
 from .cell import Cell
+from .geometry import get_geometry, ZOBRIST_COUNTS, ZOBRIST_COLORS
 
+from array import array
 from collections import deque
+import base64
 import json
-from typing import TypedDict, Literal
+import struct
+from typing import Iterator, TypedDict, Literal, Optional
+
+# Colors are stored shifted up by one so that 0 can mean "no color". A stored color fits
+# in a nibble, as the binary format and the Zobrist table expect, so a board holds at
+# most MAX_PLAYERS colors.
+NO_COLOR = 0
+MAX_STORED_COLOR = ZOBRIST_COLORS - 1
+MAX_PLAYERS = MAX_STORED_COLOR
+
+# Upper bound on cell increments for one move, so a pathological chain cannot run forever
+DEFAULT_CHAIN_BUDGET = 50_000
+
+# Binary layout: version, width, height, then one byte per cell with the
+# stored color in the high nibble and the count in the low nibble.
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct("BBB")
+MAX_PACKED_COLOR = 0x0F
+_LOW_NIBBLE = bytes(value & 0x0F for value in range(256))
+_HIGH_NIBBLE = bytes(value >> 4 for value in range(256))
+_TO_HIGH_NIBBLE = bytes((value << 4) & 0xFF for value in range(256))
 
 class BoardAction(TypedDict):
     row: int
@@ -10,130 +33,220 @@ class BoardAction(TypedDict):
     action: Literal['increment', 'exploded']
     color: int
 
+# counts, colors, per-color cell counts, number of colors, total dots, Zobrist hash
+BoardSnapshot = tuple[bytes, bytes, array, int, int, int]
+
 class Board:
+    """
+    Grid of cells stored as flat byte buffers indexed by row * width + col.
+    """
 
     def __init__(self, width: int = 6, height: int = 9) -> None:
         self.width = width
-        self.height = height 
-        self.board: list[list[Cell]] = self._init_board()
-
-    def _init_board(self) -> list[list[Cell]]:
-        board = []
-
-        for row in range(self.height):
-            current_row = []
-            for col in range(self.width):
-                current_row.append(self._init_cell(row, col))
-            board.append(current_row)
+        self.height = height
+        self.counts = bytearray(width * height)
+        self.colors = bytearray(width * height)
+        self.geometry = get_geometry(width, height)
+        self.max_counts = self.geometry.max_counts
+        # Running totals kept in step with the buffers so is_complete is O(1)
+        self.color_cells = array('I', [0]) * (MAX_STORED_COLOR + 1)
+        self.num_colors = 0
+        self.total_count = 0
+        # Zobrist hash of every (cell, count, color), 0 for an empty board
+        self.zobrist_hash = 0
 
+    def copy(self) -> "Board":
+        """
+        Return an independent copy of the board without going through serialization.
+        """
+        board = type(self).__new__(type(self))
+        board.width = self.width
+        board.height = self.height
+        board.counts = bytearray(self.counts)
+        board.colors = bytearray(self.colors)
+        board.geometry = self.geometry
+        board.max_counts = self.max_counts
+        board.color_cells = self.color_cells[:]
+        board.num_colors = self.num_colors
+        board.total_count = self.total_count
+        board.zobrist_hash = self.zobrist_hash
         return board
 
-    def _init_cell(self, row: int, col: int) -> Cell:
-        max_count = 3
+    def snapshot(self) -> BoardSnapshot:
+        return (
+            bytes(self.counts),
+            bytes(self.colors),
+            self.color_cells[:],
+            self.num_colors,
+            self.total_count,
+            self.zobrist_hash
+        )
 
-        # Left or right edge
-        if col == 0 or col == self.width - 1:
-            max_count -= 1
+    def restore(self, snapshot: BoardSnapshot) -> None:
+        """
+        Put the board back to a snapshot taken from a board of the same shape.
+        """
+        counts, colors, color_cells, num_colors, total_count, position_hash = snapshot
+        self.counts[:] = counts
+        self.colors[:] = colors
+        self.color_cells[:] = color_cells
+        self.num_colors = num_colors
+        self.total_count = total_count
+        self.zobrist_hash = position_hash
 
-        # Top or bottom edge
-        if row == 0 or row == self.height - 1:
-            max_count -= 1
+    def get_cell(self, row: int, col: int) -> Cell:
+        """
+        Return a detached Cell snapshot of the given position.
+        """
+        index = row * self.width + col
+        return Cell(
+            count=self.counts[index],
+            color=self._decode_color(self.colors[index]),
+            max_count=self.max_counts[index]
+        )
 
-        return Cell(max_count=max_count)
+    def inc_cell_count(self, row: int, col: int, color: int, budget: int = DEFAULT_CHAIN_BUDGET) -> list[BoardAction] | None:
+        batches = self.iter_inc_cell_count(row, col, color, budget)
+        if batches is None:
+            return None
+        return [action for batch in batches for action in batch]
 
-    def inc_cell_count(self, row: int, col: int, color: int) -> list[BoardAction] | None:
-        cell = self.board[row][col]
+    def iter_inc_cell_count(self, row: int, col: int, color: int, budget: int = DEFAULT_CHAIN_BUDGET) -> Iterator[list[BoardAction]] | None:
+        """
+        Same move as inc_cell_count, but yields the chain's actions one explosion level at a time
+        so callers can stream them. The iterator must be exhausted for the move to finish.
+        Returns None if the cell belongs to another color.
+        """
+        index = row * self.width + col
+        cell_color = self.colors[index]
 
-        if cell.get_color() is None or cell.get_color() == color:
-            cell.change_color(color)
-            actions = self._increment_cell(row, col, color)
-            return actions
+        if cell_color == NO_COLOR or cell_color == color + 1:
+            return (actions for actions, _ in self._increment_cell(index, color, budget) if actions)
 
         return None
 
-    def _increment_cell(self, row: int, col: int, color: int) -> list[BoardAction]:
+    def _increment_cell(self, start_index: int, color: int, budget: int) -> Iterator[tuple[list[BoardAction], int]]:
+        """
+        Resolve the chain breadth first, one explosion level at a time. Stops as soon as the
+        board is won, or after `budget` cell increments, in which case the hits still queued
+        are dropped. Yields each level's actions and how many of its hits were applied.
+        """
         queue = deque()
-        queue.append((row, col))
+        queue.append(start_index)
+        row, col = self.geometry.coords[start_index]
         actions = []
         actions.append(BoardAction(row=row, col=col, action='increment', color=color))
 
+        neighbors = self.geometry.neighbors
+        coords = self.geometry.coords
+        counts = self.counts
+        colors = self.colors
+        max_counts = self.max_counts
+        color_cells = self.color_cells
+        num_colors = self.num_colors
+        total_count = self.total_count
+        zobrist_counts = self.geometry.zobrist_counts
+        zobrist_colors = self.geometry.zobrist_colors
+        position_hash = self.zobrist_hash
+        stored_color = color + 1
+        steps_left = budget
+
         while queue:
-            if self.is_complete():
-                return actions
-            
-            crow, ccol = queue.popleft()
-
-            # ✅ Correct boundary check
-            if crow < 0 or crow >= self.height:
-                continue
-            if ccol < 0 or ccol >= self.width:
-                continue
-
-            cell: Cell = self.board[crow][ccol]
-            cell.change_color(color)
-            exploded = cell.inc_count()
-            
-            if exploded:
-                actions.append(BoardAction(row=crow, col=ccol, action='exploded', color=color))
-                queue.append((crow + 1, ccol))
-                queue.append((crow - 1, ccol))
-                queue.append((crow, ccol + 1))
-                queue.append((crow, ccol - 1))
-
-        return actions
-
-    def _increment_cell_new(self, row: int, col: int, color: int, board_states: list[str]) -> None:
-        queue = deque()
+            hit_count = 0
+            for _ in range(len(queue)):
+                if (num_colors < 2 and total_count > 1) or steps_left <= 0:
+                    queue.clear()
+                    break
+                steps_left -= 1
+                hit_count += 1
 
-        result = self._inc_single_cell(row, col, color)
-        if result is not None:
-            queue.append(result)
+                index = queue.popleft()
+                count = counts[index] + 1
+                old_color = colors[index]
 
-        while queue:
-            if self.is_complete():
-                return
-            queue_list = list(queue)
-            for crow, ccol in queue_list:
-                _ = queue.popleft()
-            
-                if crow != self.height - 1:
-                    result = self._inc_single_cell(crow + 1, ccol, color)
-                    if result is not None:
-                        queue.append(result)
-                
-                if crow != 0:
-                    result = self._inc_single_cell(crow - 1, ccol, color)
-                    if result is not None:
-                        queue.append(result)
-
-                if ccol != self.width - 1:
-                    result = self._inc_single_cell(crow, ccol + 1, color)
-                    if result is not None:
-                        queue.append(result)
-                
-                if ccol != 0:
-                    result = self._inc_single_cell(crow, ccol - 1, color)
-                    if result is not None:
-                        queue.append(result)
-            
-            board_states.append(self.serialize())   
-            
-
-    def _inc_single_cell(self, row: int, col: int, color: int) -> tuple[int, int] | None:
-        cell: Cell = self.board[row][col]
-        cell.change_color(color)
-        exploded = cell.inc_count()
-        if exploded:
-            return row, col
-        return None
+                if count > max_counts[index]:
+                    total_count -= count - 1
+                    counts[index] = 0
+                    position_hash ^= zobrist_counts[index * ZOBRIST_COUNTS + count - 1]
+                    if old_color != NO_COLOR:
+                        color_cells[old_color] -= 1
+                        if color_cells[old_color] == 0:
+                            num_colors -= 1
+                        colors[index] = NO_COLOR
+                        position_hash ^= zobrist_colors[index * ZOBRIST_COLORS + old_color]
+                    crow, ccol = coords[index]
+                    actions.append(BoardAction(row=crow, col=ccol, action='exploded', color=color))
+                    queue.extend(neighbors[index])
+                else:
+                    total_count += 1
+                    counts[index] = count
+                    count_key = index * ZOBRIST_COUNTS + count
+                    position_hash ^= zobrist_counts[count_key - 1] ^ zobrist_counts[count_key]
+                    if old_color != stored_color:
+                        if old_color != NO_COLOR:
+                            color_cells[old_color] -= 1
+                            if color_cells[old_color] == 0:
+                                num_colors -= 1
+                        if color_cells[stored_color] == 0:
+                            num_colors += 1
+                        color_cells[stored_color] += 1
+                        colors[index] = stored_color
+                        color_key = index * ZOBRIST_COLORS
+                        position_hash ^= zobrist_colors[color_key + old_color] ^ zobrist_colors[color_key + stored_color]
+
+            self.num_colors = num_colors
+            self.total_count = total_count
+            self.zobrist_hash = position_hash
+            if actions or hit_count:
+                yield actions, hit_count
+                actions = []
+
+    def _recount(self) -> None:
+        """
+        Rebuild the running color and dot totals and the Zobrist hash from the buffers.
+        """
+        color_cells = array('I', [0]) * (MAX_STORED_COLOR + 1)
+        stored_colors = set(self.colors)
+        stored_colors.discard(NO_COLOR)
+        for stored_color in stored_colors:
+            color_cells[stored_color] = self.colors.count(stored_color)
+        self.color_cells = color_cells
+        self.num_colors = len(stored_colors)
+        self.total_count = sum(self.counts)
+        self.zobrist_hash = self._compute_hash()
+
+    def _compute_hash(self) -> int:
+        zobrist_counts = self.geometry.zobrist_counts
+        zobrist_colors = self.geometry.zobrist_colors
+        position_hash = 0
+        for index, (count, stored_color) in enumerate(zip(self.counts, self.colors)):
+            if count or stored_color:
+                position_hash ^= zobrist_counts[index * ZOBRIST_COUNTS + count]
+                position_hash ^= zobrist_colors[index * ZOBRIST_COLORS + stored_color]
+        return position_hash
+
+    @staticmethod
+    def _decode_color(stored_color: int) -> Optional[int]:
+        return None if stored_color == NO_COLOR else stored_color - 1
 
     def serialize(self) -> str:
+        width = self.width
+        counts = self.counts
+        colors = self.colors
+        max_counts = self.max_counts
         board_json = [
-            [cell.to_dict() for cell in row]
-            for row in self.board
+            [
+                {
+                    "count": counts[index],
+                    "color": None if colors[index] == NO_COLOR else colors[index] - 1,
+                    "max_count": max_counts[index],
+                }
+                for index in range(row * width, (row + 1) * width)
+            ]
+            for row in range(self.height)
         ]
         return json.dumps(board_json)
-    
+
     @classmethod
     def deserialize(cls, json_str: str) -> "Board":
         """
@@ -146,24 +259,81 @@ class Board:
         height = len(data)
         width = len(data[0]) if height > 0 else 0
         board_instance = cls(width=width, height=height)
+        counts = board_instance.counts
+        colors = board_instance.colors
 
-        for row_idx, row_data in enumerate(data):
-            for col_idx, cell_data in enumerate(row_data):
-                # Reconstruct each cell
-                board_instance.board[row_idx][col_idx] = Cell(
-                    count=cell_data["count"],
-                    color=cell_data.get("color"),
-                    max_count=cell_data["max_count"]
-                )
+        index = 0
+        for row_data in data:
+            for cell_data in row_data:
+                # max_count is derived from the geometry, so only count and color are read
+                counts[index] = cell_data["count"]
+                color = cell_data.get("color")
+                if color is not None and color >= MAX_PLAYERS:
+                    raise ValueError(f"Board color {color} is out of range")
+                colors[index] = NO_COLOR if color is None else color + 1
+                index += 1
 
+        board_instance._recount()
         return board_instance
-    
+
+    def to_bytes(self) -> bytes:
+        """
+        Encode the board in the compact binary format. Raises ValueError if a color does not fit in a nibble.
+        """
+        if self.num_colors and max(self.colors) > MAX_PACKED_COLOR:
+            raise ValueError("Board colors do not fit the binary format")
+        size = self.width * self.height
+        packed = (
+            int.from_bytes(self.colors.translate(_TO_HIGH_NIBBLE)) | int.from_bytes(self.counts)
+        ).to_bytes(size)
+        return BINARY_HEADER.pack(BINARY_VERSION, self.width, self.height) + packed
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Board":
+        """
+        Create a Board instance from the compact binary format.
+        """
+        if len(data) < BINARY_HEADER.size:
+            raise ValueError("Empty board data")
+        version, width, height = BINARY_HEADER.unpack_from(data)
+        if version != BINARY_VERSION:
+            raise ValueError(f"Unsupported board encoding version {version}")
+        packed = data[BINARY_HEADER.size:]
+        if len(packed) != width * height:
+            raise ValueError("Board data does not match its dimensions")
+
+        board_instance = cls(width=width, height=height)
+        board_instance.counts = bytearray(packed.translate(_LOW_NIBBLE))
+        board_instance.colors = bytearray(packed.translate(_HIGH_NIBBLE))
+        board_instance._recount()
+        return board_instance
+
+    def to_state(self) -> str:
+        """
+        Encode the board for a GAME_STATE row: base64 of to_bytes, or JSON if the colors don't fit.
+        """
+        try:
+            return base64.b64encode(self.to_bytes()).decode("ascii")
+        except ValueError:
+            return self.serialize()
+
+    @classmethod
+    def from_state(cls, state: str) -> "Board":
+        """
+        Decode a GAME_STATE row written by to_state, falling back to legacy JSON rows.
+        """
+        if state.startswith("["):
+            return cls.deserialize(state)
+        return cls.from_bytes(base64.b64decode(state))
+
+    def has_legal_move(self, color: int) -> bool:
+        """
+        True if the player has an empty cell or a cell of their own to play.
+        """
+        return NO_COLOR in self.colors or (color + 1) in self.colors
+
     def is_complete(self) -> bool:
-        colors = set()
-        count = 0
-        for row in self.board:
-            for cell in row:
-                if cell.color is not None:
-                    colors.add(cell.color)
-                count += cell.count
-        return len(colors) < 2 and count > 1
+        """
+        True once at most one color is left on a board holding more than one dot.
+        """
+        return self.num_colors < 2 and self.total_count > 1
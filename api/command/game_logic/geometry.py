@@ -0,0 +1,83 @@
+from array import array
+from functools import lru_cache
+import random
+
+# Zobrist key slots per cell: counts 0-3 and stored colors 0-15, no color plus the
+# 15 player colors a board supports
+ZOBRIST_COUNTS = 4
+ZOBRIST_COLORS = 16
+
+
+class BoardGeometry:
+    """
+    Capacity, neighbor and Zobrist tables for one board shape, shared by every board of that shape.
+    """
+
+    def __init__(self, width: int, height: int) -> None:
+        self.width = width
+        self.height = height
+        self.size = width * height
+        self.max_counts = self._init_max_counts()
+        self.neighbors = self._init_neighbors()
+        self.coords = tuple(divmod(index, width) for index in range(self.size))
+        self.zobrist_counts, self.zobrist_colors = self._init_zobrist()
+
+    def _init_max_counts(self) -> bytes:
+        max_counts = bytearray(self.size)
+
+        for row in range(self.height):
+            for col in range(self.width):
+                max_counts[row * self.width + col] = self._init_max_count(row, col)
+
+        return bytes(max_counts)
+
+    def _init_max_count(self, row: int, col: int) -> int:
+        max_count = 3
+
+        # Left or right edge
+        if col == 0 or col == self.width - 1:
+            max_count -= 1
+
+        # Top or bottom edge
+        if row == 0 or row == self.height - 1:
+            max_count -= 1
+
+        return max_count
+
+    def _init_zobrist(self) -> tuple[array, array]:
+        """
+        Random 64-bit keys per (cell, count) and (cell, color). Seeded by the shape so
+        hashes agree across processes, and zero for an empty cell so an empty board hashes to 0.
+        """
+        rng = random.Random(f"zobrist-{self.width}x{self.height}")
+        count_keys = array('Q', rng.randbytes(8 * self.size * ZOBRIST_COUNTS))
+        color_keys = array('Q', rng.randbytes(8 * self.size * ZOBRIST_COLORS))
+        for index in range(self.size):
+            count_keys[index * ZOBRIST_COUNTS] = 0
+            color_keys[index * ZOBRIST_COLORS] = 0
+        return count_keys, color_keys
+
+    def _init_neighbors(self) -> tuple[tuple[int, ...], ...]:
+        neighbors = []
+
+        for row in range(self.height):
+            for col in range(self.width):
+                index = row * self.width + col
+                cell_neighbors = []
+                # Same order the explosion has always visited them in: down, up, right, left
+                if row != self.height - 1:
+                    cell_neighbors.append(index + self.width)
+                if row != 0:
+                    cell_neighbors.append(index - self.width)
+                if col != self.width - 1:
+                    cell_neighbors.append(index + 1)
+                if col != 0:
+                    cell_neighbors.append(index - 1)
+                neighbors.append(tuple(cell_neighbors))
+
+        return tuple(neighbors)
+
+
+@lru_cache(maxsize=64)
+def get_geometry(width: int, height: int) -> BoardGeometry:
+    return BoardGeometry(width, height)
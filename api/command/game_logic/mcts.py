@@ -0,0 +1,181 @@
+from .board import Board, NO_COLOR
+from .rules import legal_cells, is_game_over, turn_order_to_move
+from .transposition import TranspositionTable
+
+from typing import Optional
+import math
+import random
+import time
+
+# Index used when a player has no empty or own cell left and must pass
+PASS = -1
+EXPLORATION = 1.4
+ROLLOUT_DEPTH = 40
+# Random probes tried before falling back to scanning the board for a legal cell
+RANDOM_PROBES = 8
+# Rollouts averaged for a position before its cached score is reused instead of simulating again
+ROLLOUTS_PER_POSITION = 4
+
+# Summed rollout scores and rollout count, keyed by position hash, board shape, turn and number
+# of players. Module level so a worker process keeps reusing positions across searches.
+_ROLLOUT_SCORES: TranspositionTable[tuple[list[float], int]] = TranspositionTable(max_size=200_000)
+
+
+def legal_moves(board: Board, color: int) -> list[int]:
+    return legal_cells(board, color) or [PASS]
+
+
+class Node:
+    __slots__ = ("parent", "move", "color", "turn", "children", "untried", "visits", "reward", "terminal")
+
+    def __init__(self, parent: Optional["Node"], move: int, color: int, turn: int) -> None:
+        self.parent = parent
+        self.move = move
+        # Color of the player whose move led to this node
+        self.color = color
+        # Moves played once this node is reached
+        self.turn = turn
+        self.children: list[Node] = []
+        self.untried: list[int] = []
+        self.visits = 0
+        self.reward = 0.0
+        self.terminal = False
+
+    def best_child(self) -> "Node":
+        log_visits = math.log(self.visits)
+        return max(
+            self.children,
+            key=lambda child: child.reward / child.visits + EXPLORATION * math.sqrt(log_visits / child.visits)
+        )
+
+
+class MCTSBot:
+    """
+    Monte Carlo tree search player. Searches until its time budget runs out.
+    """
+
+    def __init__(
+        self,
+        num_players: int,
+        time_budget: float = 1.0,
+        rng: random.Random | None = None,
+        transpositions: TranspositionTable[tuple[list[float], int]] | None = None
+    ) -> None:
+        self.num_players = num_players
+        self.time_budget = time_budget
+        self.rng = rng or random.Random()
+        self.transpositions = _ROLLOUT_SCORES if transpositions is None else transpositions
+
+    def choose_move(self, board: Board, turn_count: int) -> tuple[int, int] | None:
+        """
+        Pick a cell for the player whose turn it is after `turn_count` moves,
+        or None if they have no cell to play and must pass.
+        """
+        deadline = time.perf_counter() + self.time_budget
+        color = turn_order_to_move(turn_count, self.num_players)
+        root = Node(None, PASS, (color - 1) % self.num_players, turn_count)
+        root.untried = legal_moves(board, color)
+
+        while time.perf_counter() < deadline:
+            sim = board.copy()
+            node = self._select(root, sim)
+            node = self._expand(node, sim)
+            scores = self._rollout(sim, node.turn)
+            self._backpropagate(node, scores)
+
+        if not root.children:
+            move = root.untried[0]
+        else:
+            move = max(root.children, key=lambda child: child.visits).move
+        if move == PASS:
+            return None
+        return divmod(move, board.width)
+
+    def _play(self, sim: Board, move: int, color: int) -> None:
+        if move != PASS:
+            sim.inc_cell_count(*divmod(move, sim.width), color)
+
+    def _select(self, node: Node, sim: Board) -> Node:
+        while not node.untried and node.children and not node.terminal:
+            node = node.best_child()
+            self._play(sim, node.move, node.color)
+        return node
+
+    def _expand(self, node: Node, sim: Board) -> Node:
+        if node.terminal or not node.untried:
+            return node
+        move = node.untried.pop(self.rng.randrange(len(node.untried)))
+        color = turn_order_to_move(node.turn, self.num_players)
+        self._play(sim, move, color)
+
+        child = Node(node, move, color, node.turn + 1)
+        child.terminal = is_game_over(sim, child.turn, self.num_players)
+        if not child.terminal:
+            child.untried = legal_moves(sim, turn_order_to_move(child.turn, self.num_players))
+        node.children.append(child)
+        return child
+
+    def _rollout(self, sim: Board, turn: int) -> list[float]:
+        """
+        Score the given position for every color. Once a position has been rolled out
+        ROLLOUTS_PER_POSITION times, the average of those rollouts is reused.
+        """
+        key = (sim.zobrist_hash, sim.width, sim.height, turn, self.num_players)
+        entry = self.transpositions.get(key)
+        if entry is not None and entry[1] >= ROLLOUTS_PER_POSITION:
+            score_sums, rollouts = entry
+            return [score / rollouts for score in score_sums]
+
+        scores = self._simulate(sim, turn)
+        if entry is None:
+            self.transpositions.put(key, (scores, 1))
+        else:
+            score_sums, rollouts = entry
+            self.transpositions.put(key, ([total + score for total, score in zip(score_sums, scores)], rollouts + 1))
+        return scores
+
+    def _simulate(self, sim: Board, turn: int) -> list[float]:
+        """
+        Play random moves from the given position and score it for every color.
+        """
+        rng = self.rng
+        size = sim.width * sim.height
+        colors = sim.colors
+
+        for _ in range(ROLLOUT_DEPTH):
+            if is_game_over(sim, turn, self.num_players):
+                # Only the last mover's color is left on the board
+                winner = turn_order_to_move(turn - 1, self.num_players)
+                return [1.0 if color == winner else 0.0 for color in range(self.num_players)]
+
+            color = turn_order_to_move(turn, self.num_players)
+            stored_color = color + 1
+            move = PASS
+            for _ in range(RANDOM_PROBES):
+                index = rng.randrange(size)
+                if colors[index] == NO_COLOR or colors[index] == stored_color:
+                    move = index
+                    break
+            else:
+                move = rng.choice(legal_moves(sim, color))
+            self._play(sim, move, color)
+            turn += 1
+
+        # Cut off: score each color by its share of the owned cells
+        owned = [sim.color_cells[color + 1] for color in range(self.num_players)]
+        total = sum(owned) or 1
+        return [cells / total for cells in owned]
+
+    def _backpropagate(self, node: Node | None, scores: list[float]) -> None:
+        while node is not None:
+            node.visits += 1
+            node.reward += scores[node.color]
+            node = node.parent
+
+
+def choose_move(state: str, num_players: int, turn_count: int, time_budget: float) -> tuple[int, int] | None:
+    """
+    Entry point for worker processes: decode a GAME_STATE value and search it.
+    """
+    board = Board.from_state(state)
+    return MCTSBot(num_players, time_budget).choose_move(board, turn_count)
@@ -0,0 +1,34 @@
+from .board import Board, NO_COLOR
+
+# Turn and end-of-game rules shared by the move commands, the live games in the registry
+# and the bots, so they cannot drift apart.
+
+
+def turn_order_to_move(turn_count: int, num_players: int) -> int:
+    """
+    Turn order, which is also the color, of the player who moves after `turn_count` moves.
+    """
+    return turn_count % num_players
+
+
+def is_players_turn(turn_count: int, num_players: int, turn_order: int) -> bool:
+    return turn_order_to_move(turn_count, num_players) == turn_order
+
+
+def legal_cells(board: Board, color: int) -> list[int]:
+    """
+    Indexes of the cells the color may play: empty cells and cells it already owns.
+    """
+    stored_color = color + 1
+    return [
+        index for index, cell_color in enumerate(board.colors)
+        if cell_color == NO_COLOR or cell_color == stored_color
+    ]
+
+
+def is_game_over(board: Board, turn_count: int, num_players: int) -> bool:
+    """
+    Whether the game is won once `turn_count` moves have been made. Nobody can win before
+    everyone has moved.
+    """
+    return turn_count > num_players and board.is_complete()
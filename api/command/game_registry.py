@@ -0,0 +1,221 @@
+from ..database_access.sql_model.sql_model_database_service import SQLModelDatabaseService
+from ..models.models import Game
+from .exceptions.exceptions import (
+    GameCompleteError,
+    GameNotFoundError,
+    GameNotStartedError,
+    PlayerNotFoundError,
+    NotPlayersTurnError,
+    CellIncrementError,
+    PassNotAllowedError,
+    MoveNotSavedError
+)
+from .game_logic.board import Board, BoardAction
+from .game_logic.rules import is_players_turn, is_game_over, turn_order_to_move
+from .game_state_store import GameStateStore
+from .game_writer import GameWriter, PendingMove
+from .statements import SELECT_GAME, SELECT_SEATS
+
+from dataclasses import dataclass
+from typing import Callable
+import os
+import threading
+import time
+
+# Seconds a game can go untouched before it is dropped from memory
+GAME_IDLE_TIMEOUT = float(os.environ.get("GAME_IDLE_TIMEOUT", "600"))
+# Seconds between scans for idle games
+GAME_EVICT_INTERVAL = float(os.environ.get("GAME_EVICT_INTERVAL", "60"))
+
+
+@dataclass
+class Seat:
+    player_id: str
+    name: str
+    is_bot: bool
+
+
+class LiveGame:
+    """
+    The authoritative copy of a started game while it is held by the registry.
+    Callers hold `lock` while reading or changing it.
+    """
+
+    def __init__(self, game: Game, seats: list[Seat], board: Board) -> None:
+        self.game_id = game.id
+        self.turn_count = game.turn_count
+        self.complete = game.complete
+        self.seats = seats
+        self.turn_orders = {seat.player_id: turn_order for turn_order, seat in enumerate(seats)}
+        self.board = board
+        self.lock = threading.Lock()
+        self.last_access = time.monotonic()
+        # Set when moves of the game could not be written; the registry then reloads it
+        self.failed = False
+
+    @property
+    def player_count(self) -> int:
+        return len(self.seats)
+
+    def play(self, player_id: str, row: int, col: int) -> tuple[list[BoardAction], bool, str | None]:
+        """
+        Same checks and outcome as IncrementCellCommand.
+        Returns the board actions, whether the game is now over, and the winner's name.
+        """
+        if self.complete:
+            raise GameCompleteError()
+        player_order_num = self.get_turn_order(player_id)
+        if not is_players_turn(self.turn_count, self.player_count, player_order_num):
+            raise NotPlayersTurnError()
+        board_actions = self.board.inc_cell_count(row, col, player_order_num)
+        if board_actions is None:
+            raise CellIncrementError()
+
+        self.turn_count += 1
+        self.complete = is_game_over(self.board, self.turn_count, self.player_count)
+        winner_name = self.seats[player_order_num].name if self.complete else None
+        return board_actions, self.complete, winner_name
+
+    def pass_turn(self, player_id: str) -> None:
+        """
+        Same checks and outcome as PassTurnCommand: the turn moves on without a move.
+        """
+        if self.complete:
+            raise GameCompleteError()
+        player_order_num = self.get_turn_order(player_id)
+        if not is_players_turn(self.turn_count, self.player_count, player_order_num):
+            raise NotPlayersTurnError()
+        if self.board.has_legal_move(player_order_num):
+            raise PassNotAllowedError()
+        self.turn_count += 1
+
+    def get_turn_order(self, player_id: str) -> int:
+        if player_id not in self.turn_orders:
+            raise PlayerNotFoundError()
+        return self.turn_orders[player_id]
+
+    def current_seat(self) -> Seat:
+        return self.seats[turn_order_to_move(self.turn_count, self.player_count)]
+
+
+class GameRegistry:
+    """
+    In-process registry of active games. Games are loaded from the database on first use,
+    changed in memory, persisted through a GameWriter, and dropped once idle.
+    """
+
+    def __init__(
+        self,
+        database_service: SQLModelDatabaseService,
+        idle_timeout: float = GAME_IDLE_TIMEOUT,
+        on_failure: Callable[[str], None] | None = None,
+        evict_interval: float = GAME_EVICT_INTERVAL
+    ) -> None:
+        self.database_service = database_service
+        self.idle_timeout = idle_timeout
+        self.evict_interval = evict_interval
+        # Called from the writer thread with each game whose unsaved moves were rolled back
+        self.on_failure = on_failure
+        self.game_state_store = GameStateStore(database_service)
+        self._games: dict[str, LiveGame] = {}
+        self._lock = threading.Lock()
+        # Guarded by _lock
+        self._next_eviction = time.monotonic() + evict_interval
+        self.writer = GameWriter(database_service, on_failure=self._on_write_failure)
+
+    def get(self, game_id: str) -> LiveGame:
+        self._evict_idle()
+        with self._lock:
+            live_game = self._games.get(game_id)
+            if live_game is not None and live_game.failed:
+                del self._games[game_id]
+                live_game = None
+        if live_game is None:
+            self._recover(game_id)
+            loaded = self._load(game_id)
+            with self._lock:
+                # Another thread may have loaded it meanwhile; the first one in wins
+                live_game = self._games.setdefault(game_id, loaded)
+        live_game.last_access = time.monotonic()
+        return live_game
+
+    def save_move(self, live_game: LiveGame, row: int | None, col: int | None, color: int) -> PendingMove:
+        """
+        Queue the move just applied to `live_game` for writing, with no row and col for a pass.
+        Call with the game's lock held, then `writer.wait` on the result once the lock is released.
+        Raises MoveNotSavedError if earlier moves of the game were lost.
+        """
+        if live_game.failed:
+            raise MoveNotSavedError()
+        move = PendingMove(
+            game_id=live_game.game_id,
+            turn=live_game.turn_count,
+            row=row,
+            col=col,
+            color=color,
+            # Only snapshot turns write the board, so the others skip the copy
+            board=live_game.board.copy() if self.game_state_store.is_snapshot_turn(live_game.turn_count) else None,
+            complete=live_game.complete
+        )
+        self.writer.submit(move)
+        return move
+
+    def close(self) -> None:
+        self.writer.close()
+
+    def _on_write_failure(self, game_ids: set[str]) -> None:
+        """
+        Stop games whose moves could not be written from taking more moves. The next use
+        reloads what the database actually holds instead of carrying on from the unsaved state.
+        """
+        for game_id in game_ids:
+            with self._lock:
+                live_game = self._games.get(game_id)
+            if live_game is not None:
+                with live_game.lock:
+                    live_game.failed = True
+            if self.on_failure is not None:
+                self.on_failure(game_id)
+
+    def _recover(self, game_id: str) -> None:
+        if not self.writer.has_failed(game_id):
+            return
+        # The writer discards the game's queued moves; once they are gone the database is current
+        self.writer.flush()
+        self.writer.reset(game_id)
+
+    def _evict_idle(self) -> None:
+        now = time.monotonic()
+        cutoff = now - self.idle_timeout
+        with self._lock:
+            # Scanning every game on every lookup would cost O(games) per move
+            if now < self._next_eviction:
+                return
+            self._next_eviction = now + self.evict_interval
+            idle = [
+                game_id for game_id, live_game in self._games.items()
+                # Games with unwritten moves stay, or a reload would read stale rows
+                if live_game.last_access < cutoff and not self.writer.has_pending(game_id)
+            ]
+            for game_id in idle:
+                del self._games[game_id]
+
+    def _load(self, game_id: str) -> LiveGame:
+        with self.database_service.unit_of_work():
+            game = self._get_game(game_id)
+            seats = self._get_seats(game_id)
+            board = self.game_state_store.load(game_id)
+        return LiveGame(game, seats, board)
+
+    def _get_seats(self, game_id: str) -> list[Seat]:
+        seats = self.database_service.select(SELECT_SEATS, {"game_id": game_id})
+        return [Seat(player_id, name, is_bot) for player_id, name, is_bot in seats]
+
+    def _get_game(self, game_id: str) -> Game:
+        games = self.database_service.select(SELECT_GAME, {"game_id": game_id})
+        if len(games) == 0:
+            raise GameNotFoundError()
+        # Players can still join until the game starts, so only started games are held
+        if games[0].started == False:
+            raise GameNotStartedError()
+        return games[0]
@@ -0,0 +1,120 @@
+from ..database_access.sql_model.sql_model_database_service import SQLModelDatabaseService
+from ..models.models import GameState, GameMove
+from ..utils.datetime_helper import datetime_now
+from .exceptions.exceptions import NoGameStateError
+from .game_logic.board import Board
+from .statements import SELECT_LATEST_SNAPSHOT, SELECT_MOVES_SINCE, INSERT_SNAPSHOT, INSERT_MOVE
+
+from datetime import datetime
+from uuid import uuid4
+import os
+
+# A full board is written every SNAPSHOT_INTERVAL turns, the moves in between are
+# logged on their own. 1 keeps the old behavior of one full board per turn.
+SNAPSHOT_INTERVAL = int(os.environ.get("GAME_STATE_SNAPSHOT_INTERVAL", "1"))
+
+
+class GameStateStore:
+    """
+    Reads and writes boards as periodic GAME_STATE snapshots plus a GAME_MOVE log.
+    """
+
+    def __init__(self, database_service: SQLModelDatabaseService, snapshot_interval: int = SNAPSHOT_INTERVAL) -> None:
+        self.database_service = database_service
+        self.snapshot_interval = max(1, snapshot_interval)
+
+    def load(self, game_id: str) -> Board:
+        """
+        Rebuild the current board by replaying the moves made since the latest snapshot.
+        """
+        snapshot = self._get_latest_snapshot(game_id)
+        board = Board.from_state(snapshot.state)
+        for move in self._get_moves_since(game_id, snapshot.turn):
+            board.inc_cell_count(move.row, move.col, move.color)
+        return board
+
+    def load_at(self, game_id: str, snapshot_state: str | None, snapshot_turn: int | None, turn_count: int) -> Board:
+        """
+        Build the board from a snapshot that was fetched together with the game row. Falls back
+        to a full load when there is no snapshot or moves were logged after it.
+        """
+        if snapshot_state is None or snapshot_turn != turn_count:
+            return self.load(game_id)
+        return Board.from_state(snapshot_state)
+
+    def is_snapshot_turn(self, turn: int) -> bool:
+        return turn % self.snapshot_interval == 0
+
+    def save_initial(self, game_id: str, board: Board) -> None:
+        self._save_snapshot(game_id, 0, board)
+
+    def save_move(self, game_id: str, turn: int, row: int | None, col: int | None, color: int, board: Board) -> None:
+        """
+        Persist the board after the given turn. At most one row is written per turn;
+        a pass, given without row and col, only writes a due snapshot.
+        """
+        if self.is_snapshot_turn(turn):
+            self._save_snapshot(game_id, turn, board)
+        elif row is not None and col is not None:
+            self._save_move(game_id, turn, row, col, color)
+
+    def save_moves(self, moves: list[tuple[str, int, int | None, int | None, int, Board | None, datetime]]) -> None:
+        """
+        Persist several (game_id, turn, row, col, color, board, created_at) moves, possibly from
+        different games, with at most one executemany per table. created_at comes from the
+        caller so snapshots written in one batch keep their order. The board is only read,
+        and only needs to be given, on snapshot turns.
+        """
+        snapshots = []
+        logged_moves = []
+        for game_id, turn, row, col, color, board, created_at in moves:
+            if self.is_snapshot_turn(turn):
+                snapshots.append({
+                    "id": str(uuid4()),
+                    "game_id": game_id,
+                    "state": board.to_state(), # type: ignore
+                    "turn": turn,
+                    "created_at": created_at
+                })
+            elif row is not None:
+                logged_moves.append({
+                    "game_id": game_id,
+                    "turn": turn,
+                    "row": row,
+                    "col": col,
+                    "color": color,
+                    "created_at": created_at
+                })
+        # executemany of one cached INSERT; the driver batches the rows into multi-row inserts
+        if snapshots:
+            self.database_service.execute(INSERT_SNAPSHOT, snapshots)
+        if logged_moves:
+            self.database_service.execute(INSERT_MOVE, logged_moves)
+
+    def _save_snapshot(self, game_id: str, turn: int, board: Board) -> None:
+        self.database_service.execute(INSERT_SNAPSHOT, {
+            "id": str(uuid4()),
+            "game_id": game_id,
+            "state": board.to_state(),
+            "turn": turn,
+            "created_at": datetime_now()
+        })
+
+    def _save_move(self, game_id: str, turn: int, row: int, col: int, color: int) -> None:
+        self.database_service.execute(INSERT_MOVE, {
+            "game_id": game_id,
+            "turn": turn,
+            "row": row,
+            "col": col,
+            "color": color,
+            "created_at": datetime_now()
+        })
+
+    def _get_latest_snapshot(self, game_id: str) -> GameState:
+        game_state = self.database_service.select(SELECT_LATEST_SNAPSHOT, {"game_id": game_id})
+        if len(game_state) == 0:
+            raise NoGameStateError()
+        return game_state[0]
+
+    def _get_moves_since(self, game_id: str, turn: int) -> list[GameMove]:
+        return self.database_service.select(SELECT_MOVES_SINCE, {"game_id": game_id, "turn": turn})
@@ -0,0 +1,242 @@
+from ..database_access.sql_model.sql_model_database_service import SQLModelDatabaseService
+from ..models.models import Game
+from ..utils.datetime_helper import datetime_now
+from .game_logic.board import Board
+from .game_state_store import GameStateStore
+from .exceptions.exceptions import MoveNotSavedError
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable
+from sqlmodel import update
+from collections import Counter
+import os
+import queue
+import threading
+import time
+import structlog
+
+logger = structlog.get_logger()
+
+# Seconds to wait between retries of the games whose moves the database rejected
+RETRY_DELAY = 1.0
+# Attempts at writing a game's moves before they are given up on
+WRITE_MAX_ATTEMPTS = int(os.environ.get("GAME_WRITE_MAX_ATTEMPTS", "5"))
+# A batch is written once it holds GAME_WRITE_BATCH_SIZE moves or its oldest move
+# has waited GAME_WRITE_INTERVAL seconds, whichever comes first
+WRITE_BATCH_SIZE = int(os.environ.get("GAME_WRITE_BATCH_SIZE", "200"))
+WRITE_INTERVAL = float(os.environ.get("GAME_WRITE_INTERVAL", "0.05"))
+# "async": a move is acknowledged once applied in memory and written with the next batch.
+# "sync": a move is acknowledged only after the batch holding it has committed.
+WRITE_DURABILITY = os.environ.get("GAME_WRITE_DURABILITY", "async")
+
+# Queue markers that make the writer thread write its batch now
+_FLUSH = object()
+_CLOSE = object()
+
+
+@dataclass
+class PendingMove:
+    game_id: str
+    turn: int
+    # None for a pass
+    row: int | None
+    col: int | None
+    color: int
+    # Copy of the board after the move on snapshot turns, None on the others
+    board: Board | None
+    complete: bool
+    created_at: datetime = field(default_factory=datetime_now)
+    # Set once the writer is done with the move, whether or not it was written
+    saved: threading.Event = field(default_factory=threading.Event)
+    failed: bool = False
+
+
+class GameWriter:
+    """
+    Write-behind persistence for moves applied in memory. A background thread collects moves
+    from every game and writes them in batches, one transaction per batch: multi-row inserts
+    into GAME_STATE and GAME_MOVE and one bulk update of GAME. When a batch fails, each of its
+    games is retried on its own, up to `max_attempts` attempts in total; the moves of a game
+    that still fails are marked failed and `on_failure` is called with the ids of those games. Later moves of those games are
+    discarded rather than written on top of the lost ones, until `reset` is called.
+    """
+
+    def __init__(
+        self,
+        database_service: SQLModelDatabaseService,
+        batch_size: int = WRITE_BATCH_SIZE,
+        interval: float = WRITE_INTERVAL,
+        durability: str = WRITE_DURABILITY,
+        max_attempts: int = WRITE_MAX_ATTEMPTS,
+        on_failure: Callable[[set[str]], None] | None = None
+    ) -> None:
+        if durability not in ("async", "sync"):
+            raise ValueError(f"Unknown write durability: {durability}")
+        self.database_service = database_service
+        self.game_state_store = GameStateStore(database_service)
+        self.batch_size = max(1, batch_size)
+        self.interval = interval
+        self.durability = durability
+        self.max_attempts = max(1, max_attempts)
+        self.on_failure = on_failure
+        self._queue: queue.Queue[PendingMove | object] = queue.Queue()
+        self._pending: Counter[str] = Counter()
+        self._pending_lock = threading.Lock()
+        # Games that lost moves; guarded by _pending_lock
+        self._failed_games: set[str] = set()
+        self._thread = threading.Thread(target=self._run, name="game-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, move: PendingMove) -> None:
+        with self._pending_lock:
+            self._pending[move.game_id] += 1
+        self._queue.put(move)
+
+    def wait(self, move: PendingMove) -> None:
+        """
+        Block until the move is committed when running with "sync" durability.
+        Raises MoveNotSavedError if the writer gave up on it.
+        """
+        if self.durability == "sync":
+            move.saved.wait()
+            if move.failed:
+                raise MoveNotSavedError()
+
+    def has_pending(self, game_id: str) -> bool:
+        with self._pending_lock:
+            return self._pending[game_id] > 0
+
+    def has_failed(self, game_id: str) -> bool:
+        with self._pending_lock:
+            return game_id in self._failed_games
+
+    def reset(self, game_id: str) -> None:
+        """
+        Accept moves of a game that lost moves again, once it has been reloaded from the database.
+        """
+        with self._pending_lock:
+            self._failed_games.discard(game_id)
+
+    def flush(self) -> None:
+        """
+        Block until everything submitted so far is in the database.
+        """
+        self._queue.put(_FLUSH)
+        self._queue.join()
+
+    def close(self) -> None:
+        """
+        Flush and stop the writer thread. This is the shutdown hook.
+        """
+        self._queue.put(_CLOSE)
+        self._queue.join()
+        self._thread.join()
+
+    def _run(self) -> None:
+        batch: list[PendingMove] = []
+        deadline = 0.0
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if batch else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                # The oldest move in the batch has waited long enough
+                self._write_batch(batch)
+                batch = []
+                continue
+
+            if isinstance(item, PendingMove):
+                if self.has_failed(item.game_id):
+                    # Written on top of the lost moves it would leave the game inconsistent
+                    item.failed = True
+                    self._release([item])
+                    continue
+                if not batch:
+                    deadline = time.monotonic() + self.interval
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    self._write_batch(batch)
+                    batch = []
+                continue
+
+            self._write_batch(batch)
+            batch = []
+            self._queue.task_done()
+            if item is _CLOSE:
+                return
+
+    def _write_batch(self, batch: list[PendingMove]) -> None:
+        if not batch:
+            return
+        if self._try_write(batch, attempt=1):
+            self._release(batch)
+            return
+
+        # Retry each game on its own, so a bad row only costs the moves of its own game
+        games: dict[str, list[PendingMove]] = {}
+        for move in batch:
+            games.setdefault(move.game_id, []).append(move)
+        for attempt in range(2, self.max_attempts + 1):
+            if attempt > 2:
+                time.sleep(RETRY_DELAY)
+            for game_id, moves in list(games.items()):
+                if self._try_write(moves, attempt):
+                    self._release(moves)
+                    del games[game_id]
+            if not games:
+                return
+
+        failed = [move for moves in games.values() for move in moves]
+        logger.error("Failed to persist moves, giving up", games=len(games), moves=len(failed), attempts=self.max_attempts)
+        self._fail(failed)
+        self._release(failed)
+
+    def _try_write(self, moves: list[PendingMove], attempt: int) -> bool:
+        try:
+            with self.database_service.unit_of_work():
+                self._write(moves)
+            return True
+        except Exception:
+            logger.exception("Failed to persist moves", moves=len(moves), attempt=attempt)
+            return False
+
+    def _release(self, moves: list[PendingMove]) -> None:
+        with self._pending_lock:
+            for move in moves:
+                self._pending[move.game_id] -= 1
+                if self._pending[move.game_id] == 0:
+                    del self._pending[move.game_id]
+        for move in moves:
+            move.saved.set()
+            self._queue.task_done()
+
+    def _fail(self, batch: list[PendingMove]) -> None:
+        for move in batch:
+            move.failed = True
+        with self._pending_lock:
+            self._failed_games.update(move.game_id for move in batch)
+        if self.on_failure is not None:
+            try:
+                self.on_failure({move.game_id for move in batch})
+            except Exception:
+                logger.exception("Failed to handle unsaved moves")
+
+    def _write(self, batch: list[PendingMove]) -> None:
+        self.game_state_store.save_moves([
+            (move.game_id, move.turn, move.row, move.col, move.color, move.board, move.created_at)
+            for move in batch
+        ])
+
+        # Only the newest move of each game decides its row
+        latest: dict[str, PendingMove] = {}
+        for move in batch:
+            latest[move.game_id] = move
+        rows = []
+        for move in latest.values():
+            row = {"id": move.game_id, "turn_count": move.turn}
+            if move.complete:
+                row.update({"complete": True, "modified_at": move.created_at})
+            rows.append(row)
+        # Bulk UPDATE by primary key, sent as one executemany per distinct set of columns
+        self.database_service.execute(update(Game), rows)
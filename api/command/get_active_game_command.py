@@ -0,0 +1,19 @@
+from .command import Command
+from ..database_access.sql_model.sql_model_database_service import SQLModelDatabaseService
+from .statements import SELECT_ACTIVE_GAME
+
+
+class GetActiveGameCommand(Command):
+
+    def __init__(self, database_service: SQLModelDatabaseService) -> None:
+        super().__init__()
+        self.database_service = database_service
+
+    def execute(self, player_id: str) -> str | None:
+        """
+        Return the id of the unfinished game the player joined most recently, or None.
+        """
+        result = self.database_service.select(SELECT_ACTIVE_GAME, {"player_id": player_id})
+        if len(result) == 0:
+            return None
+        return result[0]
@@ -0,0 +1,46 @@
+from .command import Command
+from .game_logic.rules import turn_order_to_move
+from .game_state_store import GameStateStore
+from ..database_access.sql_model.sql_model_database_service import SQLModelDatabaseService
+from ..models.models import Game
+from .exceptions.exceptions import GameNotFoundError
+from .statements import SELECT_GAME, SELECT_PLAYER_AT_TURN_ORDER
+
+
+class GetBotTurnCommand(Command):
+
+    def __init__(self, database_service: SQLModelDatabaseService) -> None:
+        super().__init__()
+        self.database_service = database_service
+        self.game_state_store = GameStateStore(database_service)
+
+    def execute(self, game_id: str) -> tuple[str, str, int, int] | None:
+        """
+        If a bot is to move in the game, return its player id, the board state,
+        the number of players and the turn count. Otherwise return None.
+        """
+        game = self._get_game(game_id)
+        if not game.started or game.complete:
+            return None
+        if game.player_count == 0:
+            return None
+        current_player = self._get_current_player(game_id, turn_order_to_move(game.turn_count, game.player_count))
+        if current_player is None:
+            return None
+        player_id, is_bot = current_player
+        if not is_bot:
+            return None
+        board = self.game_state_store.load(game_id)
+        return player_id, board.to_state(), game.player_count, game.turn_count
+
+    def _get_current_player(self, game_id: str, turn_order: int) -> tuple[str, bool] | None:
+        players = self.database_service.select(SELECT_PLAYER_AT_TURN_ORDER, {"game_id": game_id, "turn_order": turn_order})
+        if len(players) == 0:
+            return None
+        return players[0][0], players[0][1]
+
+    def _get_game(self, game_id: str) -> Game:
+        games = self.database_service.select(SELECT_GAME, {"game_id": game_id})
+        if len(games) == 0:
+            raise GameNotFoundError()
+        return games[0]
@@ -2,8 +2,9 @@ from .command import Command
 from ..database_access.sql_model.sql_model_database_service import SQLModelDatabaseService
 from ..models.models import Player
 from ..utils.datetime_helper import datetime_now
+from .statements import SELECT_PLAYER_ID_BY_EMAIL
 
-from sqlmodel import insert, select, col
+from sqlmodel import insert
 from uuid import uuid4
 
 
@@ -14,16 +15,19 @@ class GetPlayerIDCommand(Command):
         self.database_service = database_service
 
     def execute(self, email: str, name: str) -> str:
-        if self._is_new_email(email):
+        # Returning players are found on a replica; only a miss is checked on the primary
+        player_id = self._find_player_id(email, replica=True)
+        if player_id is None:
+            player_id = self._find_player_id(email)
+        if player_id is None:
             return self._create_new_player(email, name)
-        else:
-            return self._get_player_id(email)
-        
-    def _get_player_id(self, email: str) -> str:
-        stmt = select(col(Player.id)).where(
-            col(Player.email) == email
-        )
-        return self.database_service.select(stmt)[0]
+        return player_id
+
+    def _find_player_id(self, email: str, replica: bool = False) -> str | None:
+        player_ids = self.database_service.select(SELECT_PLAYER_ID_BY_EMAIL, {"email": email}, replica=replica)
+        if len(player_ids) == 0:
+            return None
+        return player_ids[0]
 
     def _create_new_player(self, email: str, name: str) -> str:
         id = str(uuid4())
@@ -35,11 +39,4 @@ class GetPlayerIDCommand(Command):
             modified_at=datetime_now()
         )
         self.database_service.execute(query)
-        return id
-    
-    def _is_new_email(self, email: str) -> bool:
-        stmt = select(Player).where(
-            col(Player.email) == email
-        )
-        players = self.database_service.select(stmt)
-        return len(players) == 0
\ No newline at end of file
+        return id
\ No newline at end of file
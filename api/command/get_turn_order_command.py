@@ -0,0 +1,20 @@
+from .command import Command
+from ..database_access.sql_model.sql_model_database_service import SQLModelDatabaseService
+from .exceptions.exceptions import PlayerNotFoundError
+from .statements import SELECT_TURN_ORDER
+
+
+class GetTurnOrderCommand(Command):
+
+    def __init__(self, database_service: SQLModelDatabaseService) -> None:
+        super().__init__()
+        self.database_service = database_service
+
+    def execute(self, game_id: str, player_id: str) -> int:
+        """
+        Return the player's turn order in the game. Raises PlayerNotFoundError if they are not in it.
+        """
+        result = self.database_service.select(SELECT_TURN_ORDER, {"game_id": game_id, "player_id": player_id})
+        if len(result) == 0:
+            raise PlayerNotFoundError()
+        return result[0]
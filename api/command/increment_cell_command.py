@@ -1,21 +1,19 @@
 from .command import Command
 from ..database_access.sql_model.sql_model_database_service import SQLModelDatabaseService
-from ..models.models import Game, GameState, GamePlayer
+from ..models.models import Game
+from ..utils.datetime_helper import datetime_now
 from .exceptions.exceptions import (
-    GameCompleteError, 
-    GameNotFoundError, 
-    GameNotStartedError, 
-    NoGameStateError, 
-    PlayerNotFoundError, 
-    NotPlayersTurnError, 
+    GameCompleteError,
+    GameNotFoundError,
+    GameNotStartedError,
+    PlayerNotFoundError,
+    NotPlayersTurnError,
     CellIncrementError
 )
 from .game_logic.board import Board, BoardAction
-from ..utils.datetime_helper import datetime_now
-
-from sqlmodel import update, select, col, and_, insert, desc
-from sqlalchemy import func
-from uuid import uuid4
+from .game_logic.rules import is_players_turn, is_game_over
+from .game_state_store import GameStateStore
+from .statements import LOCK_GAME_FOR_MOVE, INCREMENT_TURN_COUNT, UPDATE_GAME_TO_COMPLETE, SELECT_PLAYER_NAME
 
 
 class IncrementCellCommand(Command):
@@ -23,117 +21,70 @@ class IncrementCellCommand(Command):
     def __init__(self, database_service: SQLModelDatabaseService) -> None:
         super().__init__()
         self.database_service = database_service
+        self.game_state_store = GameStateStore(database_service)
 
-    def execute(self, game_id: str, player_id: str, row: int, col: int) -> list[BoardAction]:
-        game = self._validate_game(game_id)
-        self._validate_player(player_id, game_id)
-        player_order_num = self._validate_players_turn(game_id, player_id, game)
-        new_board_state, board_actions = self._increment_cell(game_id, row, col, player_order_num)
-        self._save_new_board_state(new_board_state, game_id)
+    def execute(self, game_id: str, player_id: str, row: int, col: int) -> tuple[list[BoardAction], bool, str | None]:
+        """
+        Returns the board actions, whether the move ended the game, and the winner's name.
+        """
+        game, player_order_num, num_players, snapshot_state, snapshot_turn = self._lock_game_for_move(game_id, player_id)
+        self._validate_game(game)
+        self._validate_players_turn(player_order_num, num_players, game)
+        new_board, board_actions = self._increment_cell(game, row, col, player_order_num, snapshot_state, snapshot_turn)
+        self._save_new_board_state(new_board, game, row, col, player_order_num)
         self._increment_game_turn_count(game)
-        return board_actions
+        if is_game_over(new_board, game.turn_count + 1, num_players):
+            self._update_game_to_complete(game)
+            return board_actions, True, self._get_player_name(player_id)
+        return board_actions, False, None
+
+    def _update_game_to_complete(self, game: Game) -> None:
+        self.database_service.execute(UPDATE_GAME_TO_COMPLETE, {"game_id": game.id, "modified_at": datetime_now()})
+
+    def _get_player_name(self, player_id: str) -> str:
+        return self.database_service.select(SELECT_PLAYER_NAME, {"player_id": player_id})[0]
 
     def _increment_game_turn_count(self, game: Game) -> None:
-        stmt = update(Game).where(col(Game.id) == game.id).values({
-            "turn_count": game.turn_count + 1
-        })
-        self.database_service.execute(stmt)
+        # Safe as a relative update: the GAME row is locked for the whole move
+        self.database_service.execute(INCREMENT_TURN_COUNT, {"game_id": game.id})
 
-    def _save_new_board_state(self, new_board_state: str, game_id: str) -> None:
-        stmt = insert(GameState).values({
-            "id": str(uuid4()),
-            "game_id": game_id,
-            "state": new_board_state,
-            "created_at": datetime_now()
-        })
-        self.database_service.execute(stmt)
+    def _save_new_board_state(self, new_board: Board, game: Game, row: int, col: int, color: int) -> None:
+        self.game_state_store.save_move(game.id, game.turn_count + 1, row, col, color, new_board)
 
-    def _increment_cell(self, game_id, row, col, player_order_num) -> tuple[str, list[BoardAction]]:
-        game_state = self._get_current_game_state(game_id)
-        board = Board.deserialize(game_state.state)
+    def _increment_cell(
+        self,
+        game: Game,
+        row: int,
+        col: int,
+        player_order_num: int,
+        snapshot_state: str | None,
+        snapshot_turn: int | None
+    ) -> tuple[Board, list[BoardAction]]:
+        board = self.game_state_store.load_at(game.id, snapshot_state, snapshot_turn, game.turn_count)
         board_actions = board.inc_cell_count(row, col, player_order_num)
         if board_actions is None:
             raise CellIncrementError()
-        return board.serialize(), board_actions
+        return board, board_actions
 
-    def _validate_players_turn(self, game_id, player_id, game):
-        player_order_num, num_players = self._get_player_order_num(game_id, player_id)
-        players_turn = (game.turn_count % num_players) == player_order_num
-        if not players_turn:
+    def _validate_players_turn(self, player_order_num: int | None, num_players: int, game: Game) -> None:
+        if player_order_num is None:
+            raise PlayerNotFoundError()
+        if not is_players_turn(game.turn_count, num_players, player_order_num):
             raise NotPlayersTurnError()
-        return player_order_num
-
-    def _get_player_order_num(self, game_id: str, player_id: str) -> tuple[int, int]:
-        ranked_subq = (
-            select(
-                GamePlayer.game_id,
-                GamePlayer.player_id,
-                (
-                    func.row_number()
-                    .over(
-                        partition_by=GamePlayer.game_id,
-                        order_by=GamePlayer.created_at
-                    ) - 1
-                ).label("player_index"),
-                func.count()
-                .over(
-                    partition_by=GamePlayer.game_id
-                )
-                .label("total_players")
-            )
-            .subquery()
-        )
 
-        stmt = (
-            select(
-                ranked_subq.c.player_index,
-                ranked_subq.c.total_players
-            )
-            .where(
-                ranked_subq.c.game_id == game_id,
-                ranked_subq.c.player_id == player_id
-            )
-        )
+    def _validate_game(self, game: Game) -> None:
+        if game.started == False:
+            raise GameNotStartedError()
+        if game.complete == True:
+            raise GameCompleteError()
 
-        result = self.database_service.select(stmt)
+    def _lock_game_for_move(self, game_id: str, player_id: str) -> tuple[Game, int | None, int, str | None, int | None]:
+        """
+        Lock the GAME row and fetch it with the player's turn order and the latest snapshot
+        in one round trip. The lock holds until the move commits, so a second move on the
+        same game waits and then sees the new turn count.
+        """
+        result = self.database_service.select(LOCK_GAME_FOR_MOVE, {"game_id": game_id, "player_id": player_id})
         if len(result) == 0:
-            raise PlayerNotFoundError()
-        return result[0]
-        
-    def _get_current_game_state(self, game_id: str) -> GameState:
-        stmt = (
-            select(GameState)
-            .where(col(GameState.game_id) == game_id)
-            .order_by(desc(GameState.created_at))
-            .limit(1)
-        )
-        game_state = self.database_service.select(stmt)
-        if len(game_state) == 0:
-            raise NoGameStateError()
-        return game_state[0]
-    
-    def _validate_player(self, player_id: str, game_id: str) -> None:
-        stmt = select(GamePlayer).where(
-            and_(
-                col(GamePlayer.player_id) == player_id,
-                col(GamePlayer.game_id) == game_id
-            ) 
-        )
-        players = self.database_service.select(stmt)
-        if len(players) == 0:
-            raise PlayerNotFoundError()
-    
-    def _validate_game(self, game_id: str) -> Game:
-        stmt = select(Game).where(
-            and_(
-                col(Game.id) == game_id
-            ) 
-        )
-        games = self.database_service.select(stmt)
-        if len(games) == 0:
             raise GameNotFoundError()
-        if games[0].started == False:
-            raise GameNotStartedError()
-        if games[0].complete == True:
-            raise GameCompleteError()
-        return games[0]
\ No newline at end of file
+        return tuple(result[0]) # type: ignore
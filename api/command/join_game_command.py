@@ -1,14 +1,20 @@
 from .command import Command
 from ..database_access.sql_model.sql_model_database_service import SQLModelDatabaseService
-from ..models.models import Game, GamePlayer, Player
-from .exceptions.exceptions import PlayerAlreadyInGameError, GameNotFoundError, GameAlreadyStartedError, PlayerNotFoundError
+from ..models.models import Game
+from .exceptions.exceptions import PlayerAlreadyInGameError, GameNotFoundError, GameAlreadyStartedError, GameFullError, PlayerNotFoundError
+from .game_logic.board import MAX_PLAYERS
 from ..utils.datetime_helper import datetime_now
+from .statements import (
+    SELECT_GAME,
+    SELECT_GAME_BY_CODE,
+    SELECT_GAME_PLAYER,
+    SELECT_PLAYER_ID,
+    CLAIM_TURN_ORDER,
+    INSERT_GAME_PLAYER
+)
 
 from typing import override
-from sqlmodel import select, col, and_, update, insert
 
-class NoPlayers(Exception):
-    pass
 
 class JoinGameCommand(Command):
 
@@ -22,74 +28,54 @@ class JoinGameCommand(Command):
         _ = self._get_player_id(player_id)
         try:
             self._validate_player_not_already_in_game(game.id, player_id)
-            newest_game_player = self._get_newest_game_player(game.id)
-            if game.started:
-                raise GameAlreadyStartedError()
-            self._update_add_player(game.id, player_id, newest_game_player)
-        except NoPlayers:
-            self._create_head_player(game.id, player_id)
         except PlayerAlreadyInGameError:
             return game.id, True
+        if game.started:
+            raise GameAlreadyStartedError()
+        self._add_player(game.id, player_id)
         return game.id, False
 
-    def _create_head_player(self, game_id: str, player_id: str) -> None:
-        stmt = insert(GamePlayer).values({
-            "game_id": game_id, 
-            "player_id": player_id, 
-            "created_at": datetime_now(),
-            "modified_at": datetime_now()
-        })
-        self.database_service.execute(stmt)
+    def _claim_turn_order(self, game_id: str) -> int:
+        """
+        Bump GAME.player_count and return the joining player's place in the rotation.
+        The update locks the game row, so concurrent joins get distinct places.
+        """
+        player_count = self.database_service.execute(
+            CLAIM_TURN_ORDER, {"game_id": game_id, "max_players": MAX_PLAYERS}
+        ).scalar_one_or_none()
+        if player_count is None:
+            # The game has started since it was read from a replica, or every color is taken
+            if self.database_service.select(SELECT_GAME, {"game_id": game_id})[0].started:
+                raise GameAlreadyStartedError()
+            raise GameFullError()
+        return player_count - 1
 
-    def _update_add_player(self, game_id: str, to_add_player_id: str, newest_player: GamePlayer) -> None:
-        insert_new = insert(GamePlayer).values({
+    def _add_player(self, game_id: str, player_id: str) -> None:
+        self.database_service.execute(INSERT_GAME_PLAYER, {
             "game_id": game_id, 
-            "player_id": to_add_player_id, 
+            "player_id": player_id, 
+            "turn_order": self._claim_turn_order(game_id),
             "created_at": datetime_now(),
             "modified_at": datetime_now()
         })
-        self.database_service.execute_many([insert_new])
 
-    def _get_newest_game_player(self, game_id: str) -> GamePlayer:
-        stmt = (
-            select(GamePlayer)
-            .select_from(GamePlayer)
-            .where(
-                and_(
-                    col(GamePlayer.game_id) == game_id
-                )
-            ) 
-        )
-        result = self.database_service.select(stmt)
-        if len(result) == 0:
-            raise NoPlayers()
-        newest_game_player = sorted(result, key=lambda gp: gp.created_at, reverse=True)[0]
-        return newest_game_player
-    
     def _validate_player_not_already_in_game(self, game_id: str, player_id: str) -> None:
-        stmt = select(GamePlayer).where(
-            col(GamePlayer.player_id) == player_id,
-        ).where(col(GamePlayer.game_id) == game_id)
-        players = self.database_service.select(stmt)
+        players = self.database_service.select(SELECT_GAME_PLAYER, {"game_id": game_id, "player_id": player_id})
         if len(players) > 0:
             raise PlayerAlreadyInGameError()
     
     def _get_player_id(self, player_id: str) -> str:
-        stmt = select(col(Player.id)).where(
-            col(Player.id) == player_id,
-        )
-        players = self.database_service.select(stmt)
+        players = self.database_service.select(SELECT_PLAYER_ID, {"player_id": player_id})
         if len(players) == 0:
             raise PlayerNotFoundError()
         return players[0]
 
     def _get_game(self, game_code: str) -> Game:
-        stmt = select(Game).where(
-            and_(
-                col(Game.code) == game_code
-            ) 
-        )
-        games = self.database_service.select(stmt)
+        # Codes never change; whether the game has started is rechecked on the primary when claiming a seat
+        games = self.database_service.select(SELECT_GAME_BY_CODE, {"game_code": game_code}, replica=True)
+        if len(games) == 0:
+            # Possibly a game too new to have reached the replica
+            games = self.database_service.select(SELECT_GAME_BY_CODE, {"game_code": game_code})
         if len(games) == 0:
             raise GameNotFoundError()
         return games[0]
\ No newline at end of file
@@ -0,0 +1,47 @@
+from .command import Command
+from ..database_access.sql_model.sql_model_database_service import SQLModelDatabaseService
+from ..models.models import Game
+from .exceptions.exceptions import (
+    GameCompleteError,
+    GameNotFoundError,
+    GameNotStartedError,
+    PlayerNotFoundError,
+    NotPlayersTurnError,
+    PassNotAllowedError
+)
+from .game_logic.rules import is_players_turn
+from .game_state_store import GameStateStore
+from .statements import LOCK_GAME_FOR_MOVE, INCREMENT_TURN_COUNT
+
+
+class PassTurnCommand(Command):
+
+    def __init__(self, database_service: SQLModelDatabaseService) -> None:
+        super().__init__()
+        self.database_service = database_service
+        self.game_state_store = GameStateStore(database_service)
+
+    def execute(self, game_id: str, player_id: str) -> None:
+        """
+        End the player's turn without a move. Only allowed when they have no cell to play.
+        """
+        result = self.database_service.select(LOCK_GAME_FOR_MOVE, {"game_id": game_id, "player_id": player_id})
+        if len(result) == 0:
+            raise GameNotFoundError()
+        game, player_order_num, num_players, snapshot_state, snapshot_turn = result[0]
+        self._validate(game, player_order_num, num_players)
+        board = self.game_state_store.load_at(game.id, snapshot_state, snapshot_turn, game.turn_count)
+        if board.has_legal_move(player_order_num):
+            raise PassNotAllowedError()
+        self.game_state_store.save_move(game.id, game.turn_count + 1, None, None, player_order_num, board)
+        self.database_service.execute(INCREMENT_TURN_COUNT, {"game_id": game.id})
+
+    def _validate(self, game: Game, player_order_num: int | None, num_players: int) -> None:
+        if game.started == False:
+            raise GameNotStartedError()
+        if game.complete == True:
+            raise GameCompleteError()
+        if player_order_num is None:
+            raise PlayerNotFoundError()
+        if not is_players_turn(game.turn_count, num_players, player_order_num):
+            raise NotPlayersTurnError()
@@ -1,12 +1,11 @@
 from .command import Command
 from ..database_access.sql_model.sql_model_database_service import SQLModelDatabaseService
-from ..models.models import Game, GameState
+from ..models.models import Game
 from ..utils.datetime_helper import datetime_now
 from .exceptions.exceptions import GameAlreadyStartedError, GameNotFoundError, GameCompleteError
 from .game_logic.board import Board
-
-from sqlmodel import update, select, col, and_, insert
-from uuid import uuid4
+from .game_state_store import GameStateStore
+from .statements import SELECT_GAME, UPDATE_GAME_TO_STARTED
 
 
 class StartGameCommand(Command):
@@ -14,6 +13,7 @@ class StartGameCommand(Command):
     def __init__(self, database_service: SQLModelDatabaseService) -> None:
         super().__init__()
         self.database_service = database_service
+        self.game_state_store = GameStateStore(database_service)
 
     def execute(self, game_id: str) -> None:
         game = self._validate_game(game_id)
@@ -25,29 +25,13 @@ class StartGameCommand(Command):
         return Board(game.board_width, game.board_height)
     
     def _save_init_board_state(self, board: Board, game: Game) -> None:
-        board_state = board.serialize()
-        stmt = insert(GameState).values({
-            "id": str(uuid4()),
-            "game_id": game.id,
-            "state": board_state,
-            "created_at": datetime_now()
-        })
-        self.database_service.execute(stmt)
+        self.game_state_store.save_initial(game.id, board)
 
     def _update_game_to_started(self, game_id):
-        stmt = update(Game).where(col(Game.id) == game_id).values({
-            "started": True,
-            "modified_at": datetime_now()
-        })
-        self.database_service.execute(stmt)
+        self.database_service.execute(UPDATE_GAME_TO_STARTED, {"game_id": game_id, "modified_at": datetime_now()})
     
     def _validate_game(self, game_id: str) -> Game:
-        stmt = select(Game).where(
-            and_(
-                col(Game.id) == game_id
-            ) 
-        )
-        games = self.database_service.select(stmt)
+        games = self.database_service.select(SELECT_GAME, {"game_id": game_id})
         if len(games) == 0:
             raise GameNotFoundError()
         if games[0].started == True:
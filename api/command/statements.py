@@ -0,0 +1,164 @@
+from ..models.models import Game, GamePlayer, GameState, GameMove, Player
+
+from sqlmodel import select, update, insert, col, and_, desc
+from sqlalchemy import bindparam
+
+# Statements the commands run on every request. They are built once at import, so each
+# call only binds values to an already compiled statement; values are passed as
+# bindparams by name.
+
+# GAME
+SELECT_GAME = select(Game).where(col(Game.id) == bindparam("game_id"))
+SELECT_GAME_BY_CODE = select(Game).where(col(Game.code) == bindparam("game_code"))
+SELECT_GAME_CODE = select(col(Game.code)).where(col(Game.code) == bindparam("game_code"))
+INSERT_GAME = insert(Game)
+UPDATE_GAME_TO_STARTED = (
+    update(Game)
+    .where(col(Game.id) == bindparam("game_id"))
+    .values({"started": True, "modified_at": bindparam("modified_at")})
+)
+UPDATE_GAME_TO_COMPLETE = (
+    update(Game)
+    .where(col(Game.id) == bindparam("game_id"))
+    .values({"complete": True, "modified_at": bindparam("modified_at")})
+)
+INCREMENT_TURN_COUNT = (
+    update(Game)
+    .where(col(Game.id) == bindparam("game_id"))
+    .values({"turn_count": Game.turn_count + 1})
+)
+CLAIM_TURN_ORDER = (
+    update(Game)
+    .where(
+        and_(
+            col(Game.id) == bindparam("game_id"),
+            col(Game.started) == False,
+            col(Game.player_count) < bindparam("max_players")
+        )
+    )
+    .values({"player_count": Game.player_count + 1})
+    .returning(col(Game.player_count))
+)
+
+
+def _build_lock_game_for_move():
+    turn_order = (
+        select(GamePlayer.turn_order)
+        .where(
+            and_(
+                col(GamePlayer.game_id) == Game.id,
+                col(GamePlayer.player_id) == bindparam("player_id")
+            )
+        )
+        .scalar_subquery()
+    )
+    latest_state = (
+        select(GameState.state)
+        .where(col(GameState.game_id) == Game.id)
+        .order_by(desc(GameState.created_at))
+        .limit(1)
+        .scalar_subquery()
+    )
+    latest_turn = (
+        select(GameState.turn)
+        .where(col(GameState.game_id) == Game.id)
+        .order_by(desc(GameState.created_at))
+        .limit(1)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            Game,
+            turn_order.label("turn_order"),
+            Game.player_count,
+            latest_state.label("latest_state"),
+            latest_turn.label("latest_turn")
+        )
+        .where(col(Game.id) == bindparam("game_id"))
+        .with_for_update(of=Game)
+    )
+
+
+# The game row locked with the player's turn order and the latest snapshot
+LOCK_GAME_FOR_MOVE = _build_lock_game_for_move()
+
+# GAME_PLAYER
+SELECT_GAME_PLAYER = select(GamePlayer).where(
+    and_(
+        col(GamePlayer.player_id) == bindparam("player_id"),
+        col(GamePlayer.game_id) == bindparam("game_id")
+    )
+)
+SELECT_TURN_ORDER = select(GamePlayer.turn_order).where(
+    and_(
+        col(GamePlayer.game_id) == bindparam("game_id"),
+        col(GamePlayer.player_id) == bindparam("player_id")
+    )
+)
+SELECT_PLAYER_ORDER = (
+    select(GamePlayer.turn_order, Game.player_count)
+    .select_from(GamePlayer)
+    .join(Game, col(GamePlayer.game_id) == col(Game.id))
+    .where(
+        and_(
+            col(GamePlayer.game_id) == bindparam("game_id"),
+            col(GamePlayer.player_id) == bindparam("player_id")
+        )
+    )
+)
+SELECT_PLAYER_AT_TURN_ORDER = (
+    select(col(GamePlayer.player_id), col(Player.is_bot))
+    .select_from(GamePlayer)
+    .join(Player, col(GamePlayer.player_id) == col(Player.id))
+    .where(
+        and_(
+            col(GamePlayer.game_id) == bindparam("game_id"),
+            col(GamePlayer.turn_order) == bindparam("turn_order")
+        )
+    )
+)
+SELECT_SEATS = (
+    select(col(GamePlayer.player_id), col(Player.name), col(Player.is_bot))
+    .select_from(GamePlayer)
+    .join(Player, col(GamePlayer.player_id) == col(Player.id))
+    .where(col(GamePlayer.game_id) == bindparam("game_id"))
+    .order_by(col(GamePlayer.turn_order))
+)
+SELECT_ACTIVE_GAME = (
+    select(GamePlayer.game_id)
+    .join(Game, col(GamePlayer.game_id) == col(Game.id))
+    .where(
+        and_(
+            col(GamePlayer.player_id) == bindparam("player_id"),
+            col(Game.complete) == False
+        )
+    )
+    .order_by(desc(GamePlayer.created_at))
+    .limit(1)
+)
+INSERT_GAME_PLAYER = insert(GamePlayer)
+
+# PLAYER
+SELECT_PLAYER_ID = select(col(Player.id)).where(col(Player.id) == bindparam("player_id"))
+SELECT_PLAYER_ID_BY_EMAIL = select(col(Player.id)).where(col(Player.email) == bindparam("email"))
+SELECT_PLAYER_NAME = select(Player.name).where(col(Player.id) == bindparam("player_id"))
+
+# GAME_STATE and GAME_MOVE
+SELECT_LATEST_SNAPSHOT = (
+    select(GameState)
+    .where(col(GameState.game_id) == bindparam("game_id"))
+    .order_by(desc(GameState.created_at))
+    .limit(1)
+)
+SELECT_MOVES_SINCE = (
+    select(GameMove)
+    .where(
+        and_(
+            col(GameMove.game_id) == bindparam("game_id"),
+            col(GameMove.turn) > bindparam("turn")
+        )
+    )
+    .order_by(col(GameMove.turn))
+)
+INSERT_SNAPSHOT = insert(GameState)
+INSERT_MOVE = insert(GameMove)
@@ -0,0 +1,39 @@
+"""
+Compact the GAME_STATE history of completed games, a small batch at a time.
+
+    python -m api.compact_history --batch-size 50 --pause 0.5
+
+Each batch is its own short transaction and the job sleeps between batches, so it can run
+next to live traffic. It stops once no completed game is left to compact.
+"""
+from .database_access.sql_model.sql_model_database_service import SQLModelDatabaseService
+from .command.compact_game_history_command import CompactGameHistoryCommand, RETENTION_POLICY, RETENTION_POLICIES
+
+import argparse
+import os
+import time
+
+
+def compact_history(database_service: SQLModelDatabaseService, policy: str, batch_size: int, pause: float) -> int:
+    command = CompactGameHistoryCommand(database_service, policy)
+    total = 0
+    while True:
+        with database_service.unit_of_work():
+            compacted = command.execute(batch_size)
+        total += compacted
+        if compacted < batch_size:
+            return total
+        print(f"Compacted {total} games so far")
+        time.sleep(pause)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compact the stored history of completed games.")
+    parser.add_argument("--policy", choices=RETENTION_POLICIES, default=RETENTION_POLICY,
+                        help="archive: keep history as one compressed row, drop: discard it")
+    parser.add_argument("--batch-size", type=int, default=50, help="Games compacted per transaction")
+    parser.add_argument("--pause", type=float, default=0.5, help="Seconds to sleep between batches")
+    args = parser.parse_args()
+
+    total = compact_history(SQLModelDatabaseService(os.environ["DATABASE_URL"]), args.policy, args.batch_size, args.pause)
+    print(f"Compacted {total} games")
@@ -1,17 +1,37 @@
 from abc import ABC, abstractmethod
 
-from typing import Any
+from typing import Any, ContextManager
 
 class DatabaseService(ABC):
     
     @abstractmethod
-    def select(self, query: Any) -> Any:
+    def select(self, query: Any, params: dict[str, Any] | None = None, replica: bool = False) -> Any:
         raise NotImplementedError()
     
     @abstractmethod
-    def execute(self, query: Any) -> Any:
+    def execute(self, query: Any, params: dict[str, Any] | list[dict[str, Any]] | None = None) -> Any:
         raise NotImplementedError()
     
     @abstractmethod
     def execute_many(self, queries: list[Any]) -> list[Any]:
-        raise NotImplementedError()
\ No newline at end of file
+        raise NotImplementedError()
+
+    @abstractmethod
+    def unit_of_work(self, read_only: bool = False) -> ContextManager[Any]:
+        """
+        Share one transaction between every select and execute made inside the block.
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def reading_as(self, reader: str) -> ContextManager[None]:
+        """
+        Attribute the block's reads and writes to `reader` for read-your-writes routing.
+        """
+        raise NotImplementedError()
+    @abstractmethod
+    def on_replica(self) -> bool:
+        """
+        Whether the current unit of work is served by a replica.
+        """
+        raise NotImplementedError()
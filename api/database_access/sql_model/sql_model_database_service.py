@@ -1,9 +1,16 @@
 from .sql_model_unit_of_work import SQLModelUnitOfWork
 from ..base.database_service import DatabaseService
 
-from typing import Any
+from typing import Any, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+import itertools
+import os
+import threading
+import time
 from sqlmodel import create_engine, Session
 from sqlmodel.sql.expression import Select, SelectOfScalar
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.engine.result import Result
 from sqlalchemy.sql import Executable
 
@@ -11,31 +18,143 @@ from typing import overload, TypeVar
 
 T = TypeVar("T", bound=Any)
 
+# Seconds after a reader's last write during which their replica reads go to the primary instead
+READ_YOUR_WRITES_WINDOW = 5.0
+# Compiled SQL kept per engine. Commands define their statements once at module level with
+# bindparams, so every call after the first reuses the compiled form.
+QUERY_CACHE_SIZE = int(os.environ.get("QUERY_CACHE_SIZE", "1000"))
+# Executions after which psycopg 3 prepares a statement on the server. psycopg2 has no
+# server-side prepared statements, so this only applies to postgresql+psycopg URLs.
+PREPARE_THRESHOLD = int(os.environ.get("PREPARE_THRESHOLD", "2"))
+
+
+def build_engine(url: str) -> Engine:
+    connect_args: dict[str, Any] = {}
+    if make_url(url).get_driver_name() == "psycopg":
+        connect_args["prepare_threshold"] = PREPARE_THRESHOLD
+    return create_engine(url, echo=False, query_cache_size=QUERY_CACHE_SIZE, connect_args=connect_args)
+
+
 class SQLModelDatabaseService(DatabaseService):
 
-    def __init__(self, url: str) -> None:
-        self._engine = create_engine(url, echo=False)
+    def __init__(self, url: str, replica_urls: list[str] | None = None, sticky_window: float = READ_YOUR_WRITES_WINDOW) -> None:
+        self._engine = build_engine(url)
+        self._current_session: ContextVar[Session | None] = ContextVar("current_session", default=None)
+        # Replicas serve reads that tolerate some lag. Without replicas everything uses the primary.
+        self._replica_engines = [build_engine(replica_url) for replica_url in replica_urls or []]
+        self._next_replica = itertools.cycle(range(len(self._replica_engines)))
+        self._replica_lock = threading.Lock()
+        self._sticky_window = sticky_window
+        self._current_reader: ContextVar[str | None] = ContextVar("current_reader", default=None)
+        self._last_writes: dict[str, float] = {}
 
     def _get_session(self) -> Session:
         return Session(self._engine, expire_on_commit=False)
+
+    def _get_replica_session(self) -> Session:
+        with self._replica_lock:
+            engine = self._replica_engines[next(self._next_replica)]
+        return Session(engine, expire_on_commit=False)
+
+    def _use_replica(self) -> bool:
+        if not self._replica_engines:
+            return False
+        reader = self._current_reader.get()
+        if reader is None:
+            return True
+        # Read-your-writes: someone who just wrote keeps reading from the primary for a while
+        last_write = self._last_writes.get(reader)
+        return last_write is None or time.monotonic() - last_write > self._sticky_window
+
+    def _note_write(self) -> None:
+        reader = self._current_reader.get()
+        if reader is None or not self._replica_engines:
+            return
+        now = time.monotonic()
+        with self._replica_lock:
+            self._last_writes[reader] = now
+            if len(self._last_writes) > 10_000:
+                self._last_writes = {
+                    key: last_write for key, last_write in self._last_writes.items()
+                    if now - last_write <= self._sticky_window
+                }
+
+    @contextmanager
+    def reading_as(self, reader: str) -> Iterator[None]:
+        """
+        Attribute the reads and writes inside the block to `reader`, usually a player id,
+        so their replica reads stick to the primary right after they write.
+        """
+        token = self._current_reader.set(reader)
+        try:
+            yield
+        finally:
+            self._current_reader.reset(token)
+
+    @contextmanager
+    def unit_of_work(self, read_only: bool = False) -> Iterator[Session]:
+        """
+        Run every select and execute inside the block on one session and commit once when it exits.
+        Nested blocks join the outermost one. A read-only block may be served by a replica.
+        """
+        session = self._current_session.get()
+        if session is not None:
+            yield session
+            return
+
+        session = self._get_replica_session() if read_only and self._use_replica() else self._get_session()
+        token = self._current_session.set(session)
+        try:
+            with SQLModelUnitOfWork(session):
+                yield session
+        finally:
+            self._current_session.reset(token)
     
+    def on_replica(self) -> bool:
+        session = self._current_session.get()
+        return session is not None and session.bind is not self._engine
+
     @overload
-    def select(self, query: Select[T]) -> list[T]: ...
+    def select(self, query: Select[T], params: dict[str, Any] | None = None, replica: bool = False) -> list[T]: ...
     @overload
-    def select(self, query: SelectOfScalar[T]) -> list[T]: ...
-    def select(self, query: Select[T] | SelectOfScalar[T]) -> list[T] | list[T]:
+    def select(self, query: SelectOfScalar[T], params: dict[str, Any] | None = None, replica: bool = False) -> list[T]: ...
+    def select(self, query: Select[T] | SelectOfScalar[T], params: dict[str, Any] | None = None, replica: bool = False) -> list[T] | list[T]:
+        """
+        Run a query, filling its bindparams from `params`. With `replica` it may be served by a
+        replica on its own session, even inside a unit of work, so only use it for reads that tolerate lag.
+        """
+        if replica and self._use_replica():
+            session = self._get_replica_session()
+            with SQLModelUnitOfWork(session):
+                result = list(session.exec(query, params=params).all())
+            return result
+        current_session = self._current_session.get()
+        if current_session is not None:
+            return list(current_session.exec(query, params=params).all())
         session = self._get_session()
         with SQLModelUnitOfWork(session):
-            result = list(session.exec(query).all())
+            result = list(session.exec(query, params=params).all())
         return result
     
-    def execute(self, query: Executable) -> Result[Any]:
+    def execute(self, query: Executable, params: dict[str, Any] | list[dict[str, Any]] | None = None) -> Result[Any]:
+        """
+        Run a statement, filling its bindparams from `params`. A list of params runs it once
+        per entry in a single executemany.
+        """
+        self._note_write()
+        current_session = self._current_session.get()
+        if current_session is not None:
+            return current_session.execute(query, params) # type: ignore
         session = self._get_session()
         with SQLModelUnitOfWork(session):
-            result = session.execute(query) # type: ignore
+            result = session.execute(query, params) # type: ignore
         return result 
     
     def execute_many(self, queries: list[Executable]) -> list[Result[Any]]:
+        self._note_write()
+        current_session = self._current_session.get()
+        if current_session is not None:
+            return [current_session.execute(query) for query in queries] # type: ignore
         session = self._get_session()
         results: list[Result[Any]] = []
         with SQLModelUnitOfWork(session):
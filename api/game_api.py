@@ -1,11 +1,13 @@
 
 from abc import ABC, abstractmethod
+from typing import Callable, TypeVar
 import structlog
 
 from .api_comm.response_types import (
     PlayerAddedResponse,
     CreateGameResponse,
     JoinGameResponse,
+    AddBotResponse,
     StartGameResponse,
     GetGameStateResponse,
     IncrementCellResponse
@@ -13,70 +15,214 @@ from .api_comm.response_types import (
 from .command.get_player_id_command import GetPlayerIDCommand
 from .command.create_game_command import CreateGameCommand
 from .command.join_game_command import JoinGameCommand
+from .command.add_bot_command import AddBotCommand
 from .command.start_game_command import StartGameCommand
 from .command.get_game_state_command import GetGameStateCommand
 from .command.increment_cell_command import IncrementCellCommand
-from .command.complete_game_command import CompleteGameCommand
+from .command.get_bot_turn_command import GetBotTurnCommand
+from .command.get_turn_order_command import GetTurnOrderCommand
+from .command.get_active_game_command import GetActiveGameCommand
+from .command.pass_turn_command import PassTurnCommand
+from .command.exceptions.exceptions import (
+    GameNotFoundError,
+    GameNotStartedError,
+    PlayerNotFoundError,
+    NoGameStateError
+)
+from .command.game_registry import GameRegistry
+from .command.game_logic.board import Board
+from .command.game_logic.rules import is_players_turn
 from .database_access.sql_model.sql_model_database_service import SQLModelDatabaseService
 
 
 logger = structlog.get_logger()
 
+T = TypeVar("T")
+
+# What a replica that has not caught up yet reports for rows that exist on the primary
+REPLICA_MISSES = (GameNotFoundError, GameNotStartedError, PlayerNotFoundError, NoGameStateError)
+
 
 class GameAPI(ABC):
-    def __init__(self, database_service: SQLModelDatabaseService) -> None:
+    def __init__(self, database_service: SQLModelDatabaseService, game_registry: GameRegistry | None = None) -> None:
         self.database_service = database_service
+        # Without a registry every action goes straight to the database
+        self.game_registry = game_registry
+        if game_registry is not None:
+            game_registry.on_failure = self._notify_players_of_resync
+
+    def close(self) -> None:
+        """
+        Write out every move still queued. Call before the process exits.
+        """
+        if self.game_registry is not None:
+            self.game_registry.close()
 
-    def _notify_players_of_new_state(self, board_actions: list[dict]) -> None:
+    def _notify_players_of_new_state(self, game_id: str, board_actions: list[dict]) -> None:
         # Default implementation is empty
         pass
 
-    def _notify_players_of_game_start(self) -> None:
+    def _notify_players_of_game_start(self, game_id: str) -> None:
         # Default implementation is empty
         pass
 
-    def _notify_players_of_game_complete(self, winner_name: str) -> None:
+    def _notify_players_of_game_complete(self, game_id: str, winner_name: str) -> None:
+        # Default implementation is empty
+        pass
+
+    def _notify_players_of_resync(self, game_id: str) -> None:
         # Default implementation is empty
         pass
     
     def _get_player_id(self, email: str, name: str) -> PlayerAddedResponse:
-        player_id = GetPlayerIDCommand(self.database_service).execute(email, name)
+        with self.database_service.unit_of_work():
+            player_id = GetPlayerIDCommand(self.database_service).execute(email, name)
         return PlayerAddedResponse(message="success", player_id=player_id, response_type='get_player_id')
 
     def _create_game(self, player_id: str, board_width: int, board_height: int) -> CreateGameResponse:
-        new_game_id, game_code = CreateGameCommand(self.database_service).execute(board_width, board_height)
-        _ = self._join_game(game_code, player_id)
+        with self.database_service.reading_as(player_id), self.database_service.unit_of_work():
+            new_game_id, game_code = CreateGameCommand(self.database_service).execute(board_width, board_height)
+            _ = self._join_game(game_code, player_id)
         return CreateGameResponse(game_id=new_game_id, game_code=game_code, message="success", response_type="create_game")
     
     def _join_game(self, game_code: str, player_id: str) -> JoinGameResponse:
-        game_id, already_in_game = JoinGameCommand(self.database_service).execute(game_code, player_id)
+        with self.database_service.reading_as(player_id), self.database_service.unit_of_work():
+            game_id, already_in_game = JoinGameCommand(self.database_service).execute(game_code, player_id)
         return JoinGameResponse(game_id=game_id, game_code=game_code, message="success", already_joined=already_in_game, response_type="join_game")
-    
+
+    def _add_bot(self, game_code: str) -> AddBotResponse:
+        with self.database_service.unit_of_work():
+            game_id, bot_player_id = AddBotCommand(self.database_service).execute(game_code)
+        return AddBotResponse(game_id=game_id, game_code=game_code, bot_player_id=bot_player_id, message="success", response_type="add_bot")
+
     def _start_game(self, game_id: str) -> StartGameResponse:
-        StartGameCommand(self.database_service).execute(game_id)
-        self._notify_players_of_game_start()
+        with self.database_service.unit_of_work():
+            StartGameCommand(self.database_service).execute(game_id)
+        self._notify_players_of_game_start(game_id)
         return StartGameResponse(message="success", response_type="start_game")
     
     def _get_game_state(self, game_id: str, player_id: str) -> GetGameStateResponse:
-        game_state, players_turn, player_turn_number, num_players = GetGameStateCommand(self.database_service).execute(game_id, player_id)
+        board, players_turn, player_turn_number, num_players = self._get_game_board(game_id, player_id)
+        return self._game_state_response(board, players_turn, player_turn_number, num_players)
+
+    def _game_state_response(self, board: Board, players_turn: bool, player_turn_number: int, num_players: int) -> GetGameStateResponse:
         return GetGameStateResponse(
-            game_state=game_state, 
+            game_state=board.serialize(), 
             players_turn=players_turn,
             player_turn_number=player_turn_number,
             num_players=num_players, 
             message="success", 
             response_type="get_game_state"
         )
+
+    def _get_game_board(self, game_id: str, player_id: str, primary: bool = False) -> tuple[Board, bool, int, int]:
+        """
+        Return a copy of the board, whether it is the player's turn, the player's turn
+        number and the number of players, for callers that encode the state themselves.
+        With `primary` the board is never read from a replica, for callers that pair it
+        with something only the primary is current with.
+        """
+        if self.game_registry is not None:
+            live_game = self.game_registry.get(game_id)
+            with live_game.lock:
+                player_turn_number = live_game.get_turn_order(player_id)
+                num_players = live_game.player_count
+                players_turn = is_players_turn(live_game.turn_count, num_players, player_turn_number)
+                board = live_game.board.copy()
+            return board, players_turn, player_turn_number, num_players
+        if primary:
+            with self.database_service.unit_of_work():
+                return GetGameStateCommand(self.database_service).execute(game_id, player_id)
+        # Spectators and reconnects can read from a replica, unless the player just moved
+        return self._read_from_replica(player_id, lambda: GetGameStateCommand(self.database_service).execute(game_id, player_id))
     
+    def _get_turn_order(self, game_id: str, player_id: str) -> int:
+        """
+        Return the player's turn order, raising PlayerNotFoundError if they are not in the game.
+        """
+        if self.game_registry is not None:
+            try:
+                live_game = self.game_registry.get(game_id)
+            except GameNotStartedError:
+                # Only started games are held, so players in the lobby are checked in the database
+                pass
+            else:
+                with live_game.lock:
+                    return live_game.get_turn_order(player_id)
+        return self._read_from_replica(player_id, lambda: GetTurnOrderCommand(self.database_service).execute(game_id, player_id))
+
+    def _get_active_game(self, player_id: str) -> str | None:
+        """
+        Return the unfinished game the player joined most recently, or None.
+        """
+        return self._read_from_replica(player_id, lambda: GetActiveGameCommand(self.database_service).execute(player_id))
+
+    def _read_from_replica(self, player_id: str, read: Callable[[], T]) -> T:
+        """
+        Run `read` on a replica when the player's reads may go to one, and again on the
+        primary if the replica has not caught up with what it asks for.
+        """
+        with self.database_service.reading_as(player_id):
+            on_replica = False
+            try:
+                with self.database_service.unit_of_work(read_only=True):
+                    on_replica = self.database_service.on_replica()
+                    return read()
+            except REPLICA_MISSES:
+                if not on_replica:
+                    raise
+            with self.database_service.unit_of_work():
+                return read()
+
     def _increment_cell(self, game_id: str, player_id: str, row: int, col: int) -> IncrementCellResponse:
-        board_actions = IncrementCellCommand(self.database_service).execute(game_id, player_id, row, col)
-        self._notify_players_of_new_state(board_actions)
-        game_complete, player_name = self._check_game_end(game_id, player_id)
+        if self.game_registry is not None:
+            live_game = self.game_registry.get(game_id)
+            with live_game.lock:
+                board_actions, game_complete, player_name = live_game.play(player_id, row, col)
+                pending_move = self.game_registry.save_move(live_game, row, col, live_game.get_turn_order(player_id))
+            self.game_registry.writer.wait(pending_move)
+        else:
+            # The move and the end-of-game check commit together; players only hear about committed state
+            with self.database_service.reading_as(player_id), self.database_service.unit_of_work():
+                board_actions, game_complete, player_name = IncrementCellCommand(self.database_service).execute(
+                    game_id, player_id, row, col
+                )
+        self._notify_players_of_new_state(game_id, board_actions)
         if game_complete:
             print(f"GAME COMPLETE: {player_name}")
-            self._notify_players_of_game_complete(winner_name=player_name)
+            self._notify_players_of_game_complete(game_id, winner_name=player_name)
         return IncrementCellResponse(board_actions=board_actions, message="success", response_type="increment_cell")
     
-    def _check_game_end(self, game_id: str, player_id: str) -> tuple[bool, str | None]:
-        return CompleteGameCommand(self.database_service).execute(game_id, player_id)
+    def _pass_turn(self, game_id: str, player_id: str) -> None:
+        """
+        End the turn of a player who has no cell to play.
+        """
+        if self.game_registry is not None:
+            live_game = self.game_registry.get(game_id)
+            with live_game.lock:
+                live_game.pass_turn(player_id)
+                pending_move = self.game_registry.save_move(live_game, None, None, live_game.get_turn_order(player_id))
+            self.game_registry.writer.wait(pending_move)
+        else:
+            with self.database_service.reading_as(player_id), self.database_service.unit_of_work():
+                PassTurnCommand(self.database_service).execute(game_id, player_id)
+        # No board actions tells clients to fetch the state, which shows whose turn it is
+        self._notify_players_of_new_state(game_id, [])
+
+    def _get_bot_turn(self, game_id: str) -> tuple[str, str, int, int] | None:
+        """
+        If a bot is to move in the game, return its player id, the board state,
+        the number of players and the turn count. Otherwise return None.
+        """
+        if self.game_registry is not None:
+            live_game = self.game_registry.get(game_id)
+            with live_game.lock:
+                if live_game.complete or live_game.player_count == 0:
+                    return None
+                seat = live_game.current_seat()
+                if not seat.is_bot:
+                    return None
+                return seat.player_id, live_game.board.to_state(), live_game.player_count, live_game.turn_count
+        with self.database_service.unit_of_work():
+            return GetBotTurnCommand(self.database_service).execute(game_id)
     
\ No newline at end of file
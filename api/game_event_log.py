@@ -0,0 +1,101 @@
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+import os
+import secrets
+import time
+
+# Events kept per game for clients resuming after a reconnect
+EVENT_BUFFER_SIZE = int(os.environ.get("EVENT_BUFFER_SIZE", "256"))
+# Seconds a game can go without events before its buffer is dropped
+EVENT_LOG_IDLE_TIMEOUT = float(os.environ.get("EVENT_LOG_IDLE_TIMEOUT", "600"))
+# Seconds between scans for idle buffers
+EVENT_LOG_EVICT_INTERVAL = float(os.environ.get("EVENT_LOG_EVICT_INTERVAL", "60"))
+
+
+@dataclass
+class GameEvent:
+    seq: int
+    status: str
+    data: dict[str, Any]
+    # Encoded frames by protocol, shared by every recipient and by replays
+    frames: dict[str, str | bytes] = field(default_factory=dict)
+
+
+class GameEventStream:
+    """
+    The numbered events of one game. `stream_id` changes whenever the stream is recreated,
+    so a sequence number from an earlier stream is never mistaken for one from this one.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.stream_id = secrets.randbits(31)
+        self.seq = 0
+        self.events: deque[GameEvent] = deque(maxlen=size)
+        self.last_access = time.monotonic()
+
+
+class GameEventLog:
+    """
+    Recent events of each game in a bounded ring buffer, numbered 1, 2, 3... per game.
+    Only used from the event loop, so it needs no locking.
+    """
+
+    def __init__(
+        self,
+        size: int = EVENT_BUFFER_SIZE,
+        idle_timeout: float = EVENT_LOG_IDLE_TIMEOUT,
+        evict_interval: float = EVENT_LOG_EVICT_INTERVAL
+    ) -> None:
+        self.size = max(1, size)
+        self.idle_timeout = idle_timeout
+        self.evict_interval = evict_interval
+        self._streams: dict[str, GameEventStream] = {}
+        self._next_eviction = time.monotonic() + evict_interval
+
+    def append(self, game_id: str, status: str, data: dict[str, Any]) -> GameEvent:
+        stream = self._get_stream(game_id)
+        stream.seq += 1
+        event = GameEvent(stream.seq, status, data)
+        stream.events.append(event)
+        return event
+
+    def position(self, game_id: str) -> tuple[int, int]:
+        """
+        Return the game's stream id and the sequence number of its latest event.
+        """
+        stream = self._get_stream(game_id)
+        return stream.stream_id, stream.seq
+
+    def since(self, game_id: str, stream_id: int | None, seq: int) -> list[GameEvent] | None:
+        """
+        Return the events after `seq`, or None if they can't all be replayed because the
+        buffer has rolled over or the stream is not the one the client was following.
+        """
+        stream = self._streams.get(game_id)
+        if stream is None or stream.stream_id != stream_id or seq < 0 or seq > stream.seq:
+            return None
+        oldest = stream.events[0].seq if stream.events else stream.seq + 1
+        if seq + 1 < oldest:
+            return None
+        stream.last_access = time.monotonic()
+        return [event for event in stream.events if event.seq > seq]
+
+    def _get_stream(self, game_id: str) -> GameEventStream:
+        self._evict_idle()
+        stream = self._streams.get(game_id)
+        if stream is None:
+            stream = self._streams[game_id] = GameEventStream(self.size)
+        stream.last_access = time.monotonic()
+        return stream
+
+    def _evict_idle(self) -> None:
+        # Scanning every stream on every event would cost O(games) per event
+        now = time.monotonic()
+        if now < self._next_eviction:
+            return
+        self._next_eviction = now + self.evict_interval
+        cutoff = now - self.idle_timeout
+        idle = [game_id for game_id, stream in self._streams.items() if stream.last_access < cutoff]
+        for game_id in idle:
+            del self._streams[game_id]
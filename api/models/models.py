@@ -1,8 +1,7 @@
 from typing import Any
-from sqlmodel import SQLModel, Field, create_engine
+from sqlmodel import SQLModel, Field, Index, Column, LargeBinary, text
 from datetime import datetime
 from uuid import uuid4
-import os
 from dotenv import load_dotenv
 
 load_dotenv(override=True)
@@ -10,6 +9,11 @@ load_dotenv(override=True)
 
 class Game(SQLModel, table=True):
     __tablename__ = 'GAME'
+    __table_args__ = (
+        Index("ix_GAME_code", "code", unique=True),
+        # Completed games whose history has not been compacted yet
+        Index("ix_GAME_uncompacted", "id", postgresql_where=text("complete AND compacted_at IS NULL")),
+    )
 
     id: str = Field(default=str(uuid4()), primary_key=True)
     code: str = Field(nullable=False)
@@ -18,22 +22,54 @@ class Game(SQLModel, table=True):
     started: bool = Field(default=False, nullable=False)
     complete: bool = Field(default=False, nullable=False)
     turn_count: int = Field(default=0, nullable=False)
+    player_count: int = Field(default=0, nullable=False)
     created_at: datetime = Field(nullable=False)
     modified_at: datetime = Field(nullable=False)
+    compacted_at: datetime | None = Field(default=None, nullable=True)
 
 class GameState(SQLModel, table=True):
     __tablename__ = "GAME_STATE"
+    __table_args__ = (
+        Index("ix_GAME_STATE_game_id_created_at", "game_id", text("created_at DESC")),
+    )
 
     id: str = Field(default=str(uuid4()), primary_key=True)
     game_id: str = Field(nullable=False, foreign_key='GAME.id')
     state: str = Field(nullable=False)
+    turn: int = Field(default=0, nullable=False)
+    created_at: datetime = Field(nullable=False)
+
+class GameMove(SQLModel, table=True):
+    __tablename__ = "GAME_MOVE"
+
+    game_id: str = Field(primary_key=True, foreign_key='GAME.id')
+    turn: int = Field(primary_key=True)
+    row: int = Field(nullable=False)
+    col: int = Field(nullable=False)
+    color: int = Field(nullable=False)
+    created_at: datetime = Field(nullable=False)
+
+class GameStateArchive(SQLModel, table=True):
+    __tablename__ = "GAME_STATE_ARCHIVE"
+
+    game_id: str = Field(primary_key=True, foreign_key='GAME.id')
+    # zlib-compressed JSON of every GAME_STATE and GAME_MOVE row the game had
+    history: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    state_count: int = Field(nullable=False)
+    move_count: int = Field(nullable=False)
     created_at: datetime = Field(nullable=False)
 
 class GamePlayer(SQLModel, table=True):
     __tablename__ = 'GAME_PLAYER'
+    __table_args__ = (
+        Index("ix_GAME_PLAYER_game_id_turn_order", "game_id", "turn_order", unique=True),
+        Index("ix_GAME_PLAYER_player_id_created_at", "player_id", text("created_at DESC")),
+    )
 
     game_id: str = Field(primary_key=True, foreign_key='GAME.id')
     player_id: str = Field(primary_key=True, foreign_key='PLAYER.id')
+    # Position in the turn rotation, assigned from GAME.player_count when joining
+    turn_order: int = Field(default=0, nullable=False)
     modified_at: datetime = Field(nullable=False)
     created_at: datetime = Field(nullable=False)
 
@@ -43,6 +79,7 @@ class Player(SQLModel, table=True):
     id: str = Field(default=str(uuid4()), primary_key=True)
     name: str
     email: str = Field(unique=True, nullable=False)
+    is_bot: bool = Field(default=False, nullable=False)
     created_at: datetime = Field(nullable=False)
     modified_at: datetime = Field(nullable=False)
 
@@ -56,5 +93,7 @@ class Player(SQLModel, table=True):
 
 
 if __name__ == "__main__":
-    url = os.environ['DATABASE_URL']
-    SQLModel.metadata.create_all(create_engine(url, echo=True))
\ No newline at end of file
+    # The schema is managed by the migrations in /migrations, run from the repository root
+    from alembic import command
+    from alembic.config import Config
+    command.upgrade(Config("alembic.ini"), "head")
\ No newline at end of file
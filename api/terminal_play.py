@@ -1,4 +1,12 @@
 from game_logic.board import Board  # adjust import if needed
+from game_logic.rules import legal_cells, is_game_over, turn_order_to_move
+
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import os
+import random
+import time
 
 COLOR_MAP = {
     1: "R",
@@ -18,7 +26,7 @@ def print_board(board: Board) -> None:
     for row in range(board.height):
         row_display = []
         for col in range(board.width):
-            cell = board.board[row][col]
+            cell = board.get_cell(row, col)
             count = cell.get_count()
             color = cell.get_color()
 
@@ -54,6 +62,126 @@ def get_move(board: Board):
         return None
 
 
+def pick_random_move(board: Board, color: int, rng: random.Random) -> tuple[int, int] | None:
+    options = legal_cells(board, color)
+    if not options:
+        return None
+    return divmod(rng.choice(options), board.width)
+
+
+def play_bot_game(width: int, height: int, num_players: int, seed: int, max_turns: int) -> dict:
+    """
+    Play one random bot-vs-bot game and return its move statistics.
+    """
+    rng = random.Random(seed)
+    board = Board(width=width, height=height)
+    chain_lengths: Counter[int] = Counter()
+    move_time_total = 0.0
+    worst_move_time = 0.0
+    worst_move_chain = 0
+    turn = 0
+
+    while turn < max_turns:
+        color = turn_order_to_move(turn, num_players)
+        move = pick_random_move(board, color, rng)
+        if move is None:
+            # Boxed in with no empty or own cell left, so the turn passes
+            turn += 1
+            continue
+        row, col = move
+
+        start = time.perf_counter()
+        actions = board.inc_cell_count(row, col, color)
+        move_time = time.perf_counter() - start
+
+        chain = sum(1 for action in actions if action["action"] == "exploded")
+        chain_lengths[chain] += 1
+        move_time_total += move_time
+        if move_time > worst_move_time:
+            worst_move_time = move_time
+            worst_move_chain = chain
+        turn += 1
+
+        if is_game_over(board, turn, num_players):
+            break
+
+    return {
+        "moves": turn,
+        "finished": board.is_complete(),
+        "chain_lengths": chain_lengths,
+        "move_time_total": move_time_total,
+        "worst_move_time": worst_move_time,
+        "worst_move_chain": worst_move_chain,
+    }
+
+
+def _percentile(distribution: Counter[int], fraction: float) -> int:
+    target = fraction * sum(distribution.values())
+    seen = 0
+    for value in sorted(distribution):
+        seen += distribution[value]
+        if seen >= target:
+            return value
+    return 0
+
+
+def run_self_play(width: int, height: int, num_players: int, games: int, workers: int, seed: int, max_turns: int) -> None:
+    chain_lengths: Counter[int] = Counter()
+    moves = 0
+    finished = 0
+    move_time_total = 0.0
+    worst_move_time = 0.0
+    worst_move_chain = 0
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(
+            play_bot_game,
+            [width] * games,
+            [height] * games,
+            [num_players] * games,
+            range(seed, seed + games),
+            [max_turns] * games,
+            chunksize=max(1, games // (workers * 8)),
+        )
+        for result in results:
+            moves += result["moves"]
+            finished += result["finished"]
+            chain_lengths.update(result["chain_lengths"])
+            move_time_total += result["move_time_total"]
+            if result["worst_move_time"] > worst_move_time:
+                worst_move_time = result["worst_move_time"]
+                worst_move_chain = result["worst_move_chain"]
+    elapsed = time.perf_counter() - start
+
+    print(f"{width}x{height}, {num_players} players, {games} games on {workers} workers")
+    print(f"  finished games:   {finished}/{games}")
+    print(f"  games/sec:        {games / elapsed:,.1f}")
+    print(f"  moves/sec:        {moves / elapsed:,.1f}")
+    print(f"  mean move time:   {move_time_total / max(moves, 1) * 1e6:,.1f} us")
+    print(f"  worst move time:  {worst_move_time * 1e3:,.2f} ms ({worst_move_chain} explosions)")
+    print(
+        "  chain length:     "
+        f"p50={_percentile(chain_lengths, 0.5)} "
+        f"p90={_percentile(chain_lengths, 0.9)} "
+        f"p99={_percentile(chain_lengths, 0.99)} "
+        f"max={max(chain_lengths, default=0)}"
+    )
+    print()
+
+
+def parse_size(size: str) -> tuple[int, int]:
+    width, height = size.lower().split("x")
+    return int(width), int(height)
+
+
+def self_play_main(args: argparse.Namespace) -> None:
+    for size in args.sizes:
+        width, height = parse_size(size)
+        for num_players in args.players:
+            run_self_play(width, height, num_players, args.games, args.workers, args.seed, args.max_turns)
+
+
 def main():
     board = Board(width=6, height=9)
 
@@ -81,4 +209,17 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Play the dot game in the terminal, or run headless bot self-play.")
+    parser.add_argument("--self-play", action="store_true", help="Run bot-vs-bot games instead of interactive play")
+    parser.add_argument("--games", type=int, default=1000, help="Games per board size and player count")
+    parser.add_argument("--sizes", nargs="+", default=["6x9"], help="Board sizes as WIDTHxHEIGHT")
+    parser.add_argument("--players", nargs="+", type=int, default=[2], help="Player counts to play")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first game")
+    parser.add_argument("--max-turns", type=int, default=5000, help="Turns before a game is abandoned")
+    args = parser.parse_args()
+
+    if args.self_play:
+        self_play_main(args)
+    else:
+        main()
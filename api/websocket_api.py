@@ -1,30 +1,59 @@
 from .game_api import GameAPI
 from .database_access.sql_model.sql_model_database_service import SQLModelDatabaseService
+from .api_comm.response_types import LiveGameStateResponse, ResumeGameResponse
 
-from typing import override, Optional, Any, TypedDict
+from typing import override, Optional, Any, Callable, TypedDict
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query, Response
-from functools import wraps
+from functools import wraps, partial
 from pydantic import BaseModel
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
 import json
 import asyncio
+import os
 import traceback
+import weakref
 
 from .command.exceptions.exceptions import CommandError
+from .command.game_registry import GameRegistry
+from .command.game_logic.board import Board
+from .websocket_outbox import Outbox, encode_json, BOARD_UPDATE
+from .game_event_log import GameEventLog, GameEvent
+from .websocket_protocol import (
+    JSON_PROTOCOL,
+    BINARY_PROTOCOL,
+    NEW_GAME_STATE,
+    INCREMENT_CELL,
+    negotiate,
+    encode_board_actions,
+    encode_game_state
+)
+from .command.game_logic.mcts import choose_move
+
+# Seconds of search a bot gets per move, and the processes bots search in
+BOT_TIME_BUDGET = float(os.environ.get("BOT_TIME_BUDGET", "1.0"))
+BOT_WORKERS = int(os.environ.get("BOT_WORKERS", str(os.cpu_count() or 1)))
+# Started games are played in memory and written behind. Turn this off when several
+# server processes share one database, since each process would hold its own copy.
+GAME_REGISTRY_ENABLED = os.environ.get("GAME_REGISTRY_ENABLED", "1") == "1"
 
 def websocket_response_decorator(func): # type: ignore
     @wraps(func) # type: ignore
     async def wrapper(self: 'WebsocketGameAPI', websocket: WebSocket, data: dict): # type: ignore
         
+        # Replies share the connection's outbox with broadcasts so they stay in order
+        outbox: Outbox = websocket.state.outbox
         try:
             result = await func(self, websocket, data)  # type: ignore
             print(f"Data to return: {result}")
             print()
-            await websocket.send_json({"status": "success", "data": result})
+            # Binary replies come back already encoded
+            outbox.put(result if isinstance(result, bytes) else encode_json({"status": "success", "data": result}))
         except CommandError as e:
-            await websocket.send_json({"status": "error", "code": e.status_code, "message": e.message, "error": str(e), "response_type": "error"})
+            outbox.put(encode_json({"status": "error", "code": e.status_code, "message": e.message, "error": str(e), "response_type": "error"}))
         except Exception as e:
             traceback.print_exc()
-            await websocket.send_json({"status": "error", "code": 500, "message": "Unexpected Error", "error": traceback.format_exc(), "response_type": "error"})
+            outbox.put(encode_json({"status": "error", "code": 500, "message": "Unexpected Error", "error": traceback.format_exc(), "response_type": "error"}))
     return wrapper # type: ignore
 
 class CreateGameRequest(BaseModel):
@@ -40,6 +69,9 @@ class JoinGameRequest(BaseModel):
     game_code: str
     player_id: str
 
+class AddBotRequest(BaseModel):
+    game_code: str
+
 class StartGameRequest(BaseModel):
     game_id: str
 
@@ -53,56 +85,123 @@ class IncrementCellRequest(BaseModel):
     row: int
     col: int
 
+class ResumeGameRequest(BaseModel):
+    game_id: str
+    player_id: str
+    # Stream id and sequence number of the last event the client saw
+    stream: Optional[int] = None
+    last_seq: int = 0
+
 class WebsocketConnection(TypedDict, total=False):
     websocket: WebSocket
+    outbox: Outbox
+    # The negotiated subprotocol, JSON_PROTOCOL or BINARY_PROTOCOL
+    protocol: str
+    # The player on this connection and the game room they are in
     player_game_id: tuple[str, str]
+    # Sequence number of the game's latest event when they entered the room; every later
+    # event reaches them live
+    room_seq: int
 
 
 class WebsocketGameAPI(GameAPI):
 
     def __init__(self, database_service: SQLModelDatabaseService, router: APIRouter):
-        super().__init__(database_service)
+        # Games are only played over the websocket, so this is the one API holding them in memory
+        super().__init__(database_service, GameRegistry(database_service) if GAME_REGISTRY_ENABLED else None)
         self.router = router
-        self.active_connections: dict[str, WebSocket] = {}
+        self.active_connections: dict[str, WebsocketConnection] = {}
+        # Connected player ids per game; notifications only go to the game's room
+        self.rooms: dict[str, set[str]] = {}
+        # Recent events of each game, replayed to clients that reconnect
+        self.event_log = GameEventLog()
+        # Search runs in separate processes so it never blocks the event loop
+        self.bot_executor = ProcessPoolExecutor(max_workers=BOT_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        self.bot_tasks: dict[str, asyncio.Task] = {}
+        # Games with a move since their bot task last asked whether a bot is up
+        self.bot_rechecks: set[str] = set()
+        # Game actions run in worker threads; actions on the same game still take turns
+        self.game_locks: weakref.WeakValueDictionary[str, asyncio.Lock] = weakref.WeakValueDictionary()
+        self.loop: asyncio.AbstractEventLoop | None = None
         self.router.add_api_websocket_route("/ws/game", self.websocket_endpoint)
+        self.router.add_event_handler("shutdown", self.close)
+
+    @override
+    def close(self) -> None:
+        super().close()
+        self.bot_executor.shutdown(cancel_futures=True)
 
     @websocket_response_decorator
     async def handle_action(self, websocket: WebSocket, data: dict[str, Any]) -> Any:
         action = data.get("action")
         payload = data.get("payload", {})
 
+        # The GameAPI methods do blocking database I/O, so they run in worker threads
         if action == "create_game":
             request = CreateGameRequest(**payload)
-            return super()._create_game(**request.model_dump())
+            response = await asyncio.to_thread(super()._create_game, **request.model_dump())
+            self._enter_room(request.player_id, response["game_id"])
+            return response
         elif action == "join_game":
             request = JoinGameRequest(**payload)
-            response = super()._join_game(request.game_code, request.player_id)
+            response = await asyncio.to_thread(super()._join_game, request.game_code, request.player_id)
+            self._enter_room(request.player_id, response["game_id"])
+            return response
+        elif action == "add_bot":
+            request = AddBotRequest(**payload)
+            response = await asyncio.to_thread(super()._add_bot, request.game_code)
             return response
         elif action == "start_game":
             request = StartGameRequest(**payload)
-            response = super()._start_game(request.game_id)
+            async with self._game_lock(request.game_id):
+                response = await asyncio.to_thread(super()._start_game, request.game_id)
+            self._schedule_bot_turns(request.game_id)
             return response
         elif action == "get_game_state":
             request = GetGameStateRequest(**payload)
-            response = super()._get_game_state(request.game_id, request.player_id)
-            return response
+            return await self._get_live_game_state(websocket, request.game_id, request.player_id)
+        elif action == "resume":
+            request = ResumeGameRequest(**payload)
+            return await self._resume(websocket, request)
         elif action == "increment_cell":
             request = IncrementCellRequest(**payload)
-            response = super()._increment_cell(**request.model_dump())
+            async with self._game_lock(request.game_id):
+                response = await asyncio.to_thread(super()._increment_cell, **request.model_dump())
+            self._schedule_bot_turns(request.game_id)
+            if websocket.state.protocol == BINARY_PROTOCOL:
+                try:
+                    return encode_board_actions(INCREMENT_CELL, response["board_actions"])
+                except ValueError:
+                    # Does not fit the binary layout, so this reply goes out as JSON
+                    pass
             return response
         else:
             raise ValueError(f"Unknown action: {action}")
 
     async def websocket_endpoint(self, websocket: WebSocket, player_id: str = Query(...)):
+        self.loop = asyncio.get_running_loop()
         if player_id not in self.active_connections:
             print("Accepting...")
-            await websocket.accept()
-            self.active_connections[player_id] = websocket
+            subprotocol = negotiate(websocket.scope.get("subprotocols", []))
+            await websocket.accept(subprotocol=subprotocol)
+            protocol = subprotocol or JSON_PROTOCOL
+            outbox = Outbox(
+                websocket,
+                latest_state=partial(self._latest_state, websocket, player_id),
+                on_close=partial(self._drop_connection, player_id, websocket)
+            )
+            websocket.state.outbox = outbox
+            websocket.state.protocol = protocol
+            self.active_connections[player_id] = WebsocketConnection(websocket=websocket, outbox=outbox, protocol=protocol)
         else:
             await websocket.send_denial_response(response=Response(f"Player id {player_id} already has websocket connection."))
             return
 
         try:
+            # A reconnecting player hears their game's events again without asking for them
+            game_id = await asyncio.to_thread(super()._get_active_game, player_id)
+            if game_id is not None:
+                self._enter_room(player_id, game_id)
             while True:
                 data = await websocket.receive_text()
                 data_json = json.loads(data)
@@ -110,20 +209,249 @@ class WebsocketGameAPI(GameAPI):
                 print(f"Got request: {data_json}")
                 await self.handle_action(websocket, data_json)
         except WebSocketDisconnect:
-            self.active_connections.pop(player_id)
             print("Client disconnected")
         except Exception as e:
             traceback.print_exc()
-            await websocket.send_json({"status": "error", "message": traceback.format_exc()})
+            # Dropped before the error is sent directly, in case that send never completes
+            self._drop_connection(player_id, websocket)
+            try:
+                await websocket.send_text(encode_json({"status": "error", "message": traceback.format_exc()}))
+            except Exception:
+                pass
+        finally:
+            # However the connection ended, the player must be able to connect again
+            self._drop_connection(player_id, websocket)
+
+    def _drop_connection(self, player_id: str, websocket: WebSocket) -> None:
+        connection = self.active_connections.get(player_id)
+        if connection is None or connection["websocket"] is not websocket:
+            # Already dropped, and possibly replaced by a newer connection
+            return
+        self._leave_room(player_id)
+        del self.active_connections[player_id]
+        connection["outbox"].close()
+
+    def _in_room(self, player_id: str, game_id: str) -> bool:
+        connection = self.active_connections.get(player_id)
+        return connection is not None and connection.get("player_game_id") == (player_id, game_id)
+
+    def _enter_room(self, player_id: str, game_id: str) -> None:
+        connection = self.active_connections.get(player_id)
+        if connection is None:
+            # Bots and players without a socket have nothing to receive on
+            return
+        if self._in_room(player_id, game_id):
+            return
+        self._leave_room(player_id)
+        self.rooms.setdefault(game_id, set()).add(player_id)
+        connection["player_game_id"] = (player_id, game_id)
+        _, connection["room_seq"] = self.event_log.position(game_id)
+
+    def _leave_room(self, player_id: str) -> None:
+        connection = self.active_connections.get(player_id)
+        if connection is None or "player_game_id" not in connection:
+            return
+        _, game_id = connection.pop("player_game_id")
+        room = self.rooms.get(game_id)
+        if room is not None:
+            room.discard(player_id)
+            if not room:
+                del self.rooms[game_id]
+
+    def _room_connections(self, game_id: str) -> list[tuple[str, WebsocketConnection]]:
+        return [(player_id, self.active_connections[player_id]) for player_id in self.rooms.get(game_id, ())]
+
+    async def _get_live_game_state(self, websocket: WebSocket, game_id: str, player_id: str) -> bytes | LiveGameStateResponse:
+        state = await self._read_live_game_state(game_id, player_id)
+        return self._encode_live_game_state(websocket.state.protocol, *state)
+
+    async def _latest_state(self, websocket: WebSocket, player_id: str, game_id: str) -> tuple[str | bytes, int]:
+        """
+        The frame a slow connection gets in place of the board updates it could not keep up
+        with: the same reply as get_game_state, with the sequence number it is current as of.
+        """
+        board, players_turn, player_turn_number, num_players, stream_id, seq = await self._read_live_game_state(game_id, player_id)
+        response = self._encode_live_game_state(
+            websocket.state.protocol, board, players_turn, player_turn_number, num_players, stream_id, seq
+        )
+        if isinstance(response, bytes):
+            return response, seq
+        return encode_json({"status": "success", "data": response}), seq
+
+    async def _read_live_game_state(self, game_id: str, player_id: str) -> tuple[Board, bool, int, int, int, int]:
+        async with self._game_lock(game_id):
+            if not self._in_room(player_id, game_id):
+                # Players join the room before the state is read, so those still in the
+                # lobby, whose read fails, hear game_started
+                await asyncio.to_thread(super()._get_turn_order, game_id, player_id)
+                self._enter_room(player_id, game_id)
+            # Moves number their events before giving up the game lock, so the state and
+            # the sequence number describe the same point in the game. A lagging replica
+            # could be behind the sequence number, so the board comes from the primary.
+            board, players_turn, player_turn_number, num_players = await asyncio.to_thread(
+                super()._get_game_board, game_id, player_id, True
+            )
+            stream_id, seq = self.event_log.position(game_id)
+        return board, players_turn, player_turn_number, num_players, stream_id, seq
+
+    def _encode_live_game_state(
+        self,
+        protocol: str,
+        board: Board,
+        players_turn: bool,
+        player_turn_number: int,
+        num_players: int,
+        stream_id: int,
+        seq: int
+    ) -> bytes | LiveGameStateResponse:
+        if protocol == BINARY_PROTOCOL:
+            try:
+                return encode_game_state(board, players_turn, player_turn_number, num_players, stream_id, seq)
+            except ValueError:
+                # Does not fit the binary layout, so this reply goes out as JSON
+                pass
+        response = self._game_state_response(board, players_turn, player_turn_number, num_players)
+        return LiveGameStateResponse(**response, stream=stream_id, seq=seq)
+
+    async def _resume(self, websocket: WebSocket, request: ResumeGameRequest) -> bytes | LiveGameStateResponse | ResumeGameResponse:
+        """
+        Send a reconnecting client the events it missed and put it back in the game's room.
+        Falls back to the full state when the missed events are no longer buffered.
+        """
+        # Only players in the game may hear its events
+        await asyncio.to_thread(super()._get_turn_order, request.game_id, request.player_id)
+        outbox: Outbox = websocket.state.outbox
+        missed = self.event_log.since(request.game_id, request.stream, request.last_seq)
+        # Past a full outbox, the state is cheaper to send than the events
+        if missed is None or len(missed) >= outbox.max_size:
+            return await self._get_live_game_state(websocket, request.game_id, request.player_id)
+
+        if self._in_room(request.player_id, request.game_id):
+            # Joined on connect, so the events since then have already been queued live
+            room_seq = self.active_connections[request.player_id]["room_seq"]
+            missed = [event for event in missed if event.seq <= room_seq]
+            if missed and room_seq < self.event_log.position(request.game_id)[1]:
+                # Replayed now they would arrive after the later events, so the state goes instead
+                return await self._get_live_game_state(websocket, request.game_id, request.player_id)
+        # The replay and joining the room happen without yielding, so no event is missed or sent twice
+        for event in missed:
+            outbox.put(self._encode_event(websocket.state.protocol, event, request.player_id))
+        self._enter_room(request.player_id, request.game_id)
+        return ResumeGameResponse(
+            stream=request.stream, # type: ignore
+            seq=self.event_log.position(request.game_id)[1],
+            replayed=len(missed),
+            message="success",
+            response_type="resume"
+        )
+
+    def _game_lock(self, game_id: str) -> asyncio.Lock:
+        lock = self.game_locks.get(game_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self.game_locks[game_id] = lock
+        return lock
+
+    def _schedule_bot_turns(self, game_id: str) -> None:
+        task = self.bot_tasks.get(game_id)
+        if task is not None and not task.done():
+            # The running task picks up every bot turn until a human is up. It may already
+            # have found no bot to move, so it asks again before it finishes.
+            self.bot_rechecks.add(game_id)
+            return
+        task = asyncio.create_task(self._play_bot_turns(game_id))
+        self.bot_tasks[game_id] = task
+        task.add_done_callback(lambda done: self._forget_bot_task(game_id, done))
+
+    def _forget_bot_task(self, game_id: str, task: asyncio.Task) -> None:
+        if self.bot_tasks.get(game_id) is task:
+            del self.bot_tasks[game_id]
+            self.bot_rechecks.discard(game_id)
+
+    async def _play_bot_turns(self, game_id: str) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                self.bot_rechecks.discard(game_id)
+                bot_turn = await asyncio.to_thread(self._get_bot_turn, game_id)
+                if bot_turn is None:
+                    # Checked and exited without yielding, so no later move goes unnoticed
+                    if game_id in self.bot_rechecks:
+                        continue
+                    return
+                bot_player_id, board_state, num_players, turn_count = bot_turn
+                move = await loop.run_in_executor(
+                    self.bot_executor, choose_move, board_state, num_players, turn_count, BOT_TIME_BUDGET
+                )
+                async with self._game_lock(game_id):
+                    if move is None:
+                        # Every cell belongs to another player, so the bot passes
+                        await asyncio.to_thread(super()._pass_turn, game_id, bot_player_id)
+                    else:
+                        await asyncio.to_thread(super()._increment_cell, game_id, bot_player_id, *move)
+        except CommandError as e:
+            print(f"Bot stopped in game {game_id}: {e.message}")
+        except Exception:
+            traceback.print_exc()
+
+    def _call_in_loop(self, callback: Callable[..., None], *args: Any) -> None:
+        """
+        Notifications are raised from worker threads, so sends are handed back to the event loop.
+        """
+        if self.loop is None:
+            # Nobody has connected yet, so there is nobody to notify
+            return
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    def _notify_players_of_new_state(self, game_id: str, board_actions: list[dict]) -> None:
+        self._call_in_loop(self._send_new_state, game_id, board_actions)
+
+    def _notify_players_of_game_start(self, game_id: str):
+        self._call_in_loop(self._send_game_start, game_id)
+
+    def _notify_players_of_game_complete(self, game_id: str, winner_name: str):
+        self._call_in_loop(self._send_game_complete, game_id, winner_name)
+
+    def _notify_players_of_resync(self, game_id: str) -> None:
+        self._call_in_loop(self._send_resync, game_id)
+
+    def _send_resync(self, game_id: str) -> None:
+        # Moves players were told about were not saved, so everyone gets the saved state
+        for _, connection in self._room_connections(game_id):
+            connection["outbox"].resync(game_id)
+
+    def _send_new_state(self, game_id: str, board_actions: list[dict]) -> None:
+        event = self.event_log.append(game_id, "new_game_state", {"board_actions": board_actions})
+        for player_id, connection in self._room_connections(game_id):
+            connection["outbox"].put(self._encode_event(connection["protocol"], event, player_id), BOARD_UPDATE, game_id, event.seq)
+
+    def _send_game_start(self, game_id: str) -> None:
+        # Clients that start following a game here learn which stream to resume from
+        stream_id, _ = self.event_log.position(game_id)
+        event = self.event_log.append(game_id, "game_started", {"stream": stream_id})
+        for player_id, connection in self._room_connections(game_id):
+            connection["outbox"].put(self._encode_event(connection["protocol"], event, player_id))
 
-    def _notify_players_of_new_state(self, board_actions: list[dict]) -> None:
-        for _, websocket in self.active_connections.items():
-            asyncio.create_task(websocket.send_json({"status": "new_game_state", "data": {"board_actions": board_actions}}))
+    def _send_game_complete(self, game_id: str, winner_name: str) -> None:
+        event = self.event_log.append(game_id, "game_finished", {"winner": winner_name})
+        for player_id, connection in self._room_connections(game_id):
+            connection["outbox"].put(self._encode_event(connection["protocol"], event, player_id))
 
-    def _notify_players_of_game_start(self):
-        for player_id, websocket in self.active_connections.items():
-            asyncio.create_task(websocket.send_json({"status": "game_started", "data": {"player_id": player_id}}))
+    def _encode_event(self, protocol: str, event: GameEvent, player_id: str) -> str | bytes:
+        if event.status == "new_game_state":
+            # Same frame for everyone on the same protocol, so each is encoded once
+            frame = event.frames.get(protocol)
+            if frame is None:
+                frame = event.frames[protocol] = self._encode_new_state(protocol, event)
+            return frame
+        # The other events also tell each recipient their own player id
+        return encode_json({"status": event.status, "seq": event.seq, "data": {**event.data, "player_id": player_id}})
 
-    def _notify_players_of_game_complete(self, winner_name: str):
-        for player_id, websocket in self.active_connections.items():
-            asyncio.create_task(websocket.send_json({"status": "game_finished", "data": {"winner": winner_name, "player_id": player_id}}))
+    def _encode_new_state(self, protocol: str, event: GameEvent) -> str | bytes:
+        if protocol == BINARY_PROTOCOL:
+            try:
+                return encode_board_actions(NEW_GAME_STATE, event.data["board_actions"], event.seq)
+            except ValueError:
+                # Does not fit the binary layout, so this update goes out as JSON
+                pass
+        return encode_json({"status": "new_game_state", "seq": event.seq, "data": event.data})
@@ -0,0 +1,170 @@
+from fastapi import WebSocket
+from collections import deque
+from typing import Any, Awaitable, Callable, NamedTuple
+import asyncio
+import json
+import os
+import traceback
+
+# Messages a connection may have waiting before the slow consumer policy kicks in
+OUTBOUND_QUEUE_SIZE = int(os.environ.get("OUTBOUND_QUEUE_SIZE", "64"))
+# What to do with a board update for a connection whose queue is full:
+#   "drop": discard the update
+#   "coalesce": replace its queued board updates with the game's latest state
+#   "disconnect": close the connection so the client reconnects and resyncs
+SLOW_CONSUMER_POLICY = os.environ.get("SLOW_CONSUMER_POLICY", "coalesce")
+SLOW_CONSUMER_POLICIES = ("drop", "coalesce", "disconnect")
+# Close code sent to a consumer that fell too far behind (1013: try again later)
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+BOARD_UPDATE = "board_update"
+RESYNC = "resync"
+REPLY = "reply"
+
+
+def encode_json(data: Any) -> str:
+    # Same encoding as WebSocket.send_json, done once per message instead of once per recipient
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+class QueuedMessage(NamedTuple):
+    kind: str
+    # Resync entries have no frame yet; it is built when the entry is sent
+    frame: str | bytes | None
+    game_id: str | None
+    # Event sequence number of a board update
+    seq: int
+
+
+# Builds a connection's latest-state frame for a game and returns it with its sequence number
+LatestState = Callable[[str], Awaitable[tuple[str | bytes, int]]]
+
+
+class Outbox:
+    """
+    Outbound queue for one websocket. A single writer task sends messages in the order
+    they were queued, so a slow connection never delays or reorders anyone else's.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        max_size: int = OUTBOUND_QUEUE_SIZE,
+        policy: str = SLOW_CONSUMER_POLICY,
+        latest_state: LatestState | None = None,
+        on_close: Callable[[], None] | None = None
+    ) -> None:
+        if policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Unknown slow consumer policy: {policy}")
+        self.websocket = websocket
+        self.max_size = max(1, max_size)
+        self.policy = policy
+        # Without it, coalescing can only discard the queued updates
+        self.latest_state = latest_state
+        # Called once the outbox gives up on the connection, so it can be dropped right away
+        self.on_close = on_close
+        self.dropped = 0
+        self.closed = False
+        self._messages: deque[QueuedMessage] = deque()
+        self._ready = asyncio.Event()
+        self._writer = asyncio.create_task(self._drain())
+        # Held so the event loop does not garbage collect the close before it runs
+        self._disconnect: asyncio.Task | None = None
+
+    def put(self, frame: str | bytes, kind: str = REPLY, game_id: str | None = None, seq: int = 0) -> None:
+        """
+        Queue an encoded message, sent as a text frame if it is a str and a binary frame if
+        it is bytes. Replies are always queued; board updates are subject to
+        the slow consumer policy once the queue is full.
+        """
+        if self.closed:
+            return
+        if kind == BOARD_UPDATE and len(self._messages) >= self.max_size:
+            self._overflow(game_id)
+            return
+        self._messages.append(QueuedMessage(kind, frame, game_id, seq))
+        self._ready.set()
+
+    def resync(self, game_id: str) -> None:
+        """
+        Replace the game's queued board updates with its latest state, read when it is sent.
+        """
+        if self.closed or self.latest_state is None:
+            return
+        self._messages = deque(
+            message for message in self._messages
+            if not (message.kind in (BOARD_UPDATE, RESYNC) and message.game_id == game_id)
+        )
+        self._messages.append(QueuedMessage(RESYNC, None, game_id, 0))
+        self._ready.set()
+
+    def close(self) -> None:
+        self.closed = True
+        self._messages.clear()
+        self._writer.cancel()
+
+    def _overflow(self, game_id: str | None) -> None:
+        self.dropped += 1
+        if self.policy == "drop":
+            return
+        if self.policy == "disconnect":
+            self.close()
+            self._disconnect = asyncio.create_task(self._close_websocket())
+            self._closed_by_outbox()
+            return
+
+        # Coalesce: the queued updates are replaced by the latest state, read when it is sent
+        kept = deque(message for message in self._messages if message.kind not in (BOARD_UPDATE, RESYNC))
+        if self.latest_state is not None and game_id is not None:
+            kept.append(QueuedMessage(RESYNC, None, game_id, 0))
+        self._messages = kept
+        self._ready.set()
+
+    async def _drain(self) -> None:
+        try:
+            while True:
+                await self._ready.wait()
+                while self._messages:
+                    message = self._messages.popleft()
+                    frame = message.frame
+                    if message.kind == RESYNC:
+                        frame = await self._build_latest_state(message.game_id) # type: ignore
+                        if frame is None:
+                            continue
+                    if isinstance(frame, bytes):
+                        await self.websocket.send_bytes(frame)
+                    else:
+                        await self.websocket.send_text(frame)
+                self._ready.clear()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # The socket is gone
+            traceback.print_exc()
+            self.closed = True
+            self._messages.clear()
+            self._closed_by_outbox()
+
+    async def _close_websocket(self) -> None:
+        try:
+            await self.websocket.close(code=SLOW_CONSUMER_CLOSE_CODE)
+        except Exception:
+            # The socket is already gone
+            traceback.print_exc()
+
+    def _closed_by_outbox(self) -> None:
+        if self.on_close is not None:
+            self.on_close()
+
+    async def _build_latest_state(self, game_id: str) -> str | bytes | None:
+        try:
+            frame, seq = await self.latest_state(game_id) # type: ignore
+        except Exception:
+            traceback.print_exc()
+            return None
+        # Updates queued while the state was read may already be part of it
+        self._messages = deque(
+            message for message in self._messages
+            if not (message.kind == BOARD_UPDATE and message.game_id == game_id and message.seq <= seq)
+        )
+        return frame
@@ -0,0 +1,98 @@
+from .command.game_logic.board import Board, BoardAction
+
+import struct
+
+# Subprotocols a client can offer in Sec-WebSocket-Protocol. JSON is used when the client
+# offers neither. Binary clients get increment_cell and get_game_state replies and
+# new_game_state broadcasts as binary frames; every other message stays JSON text.
+JSON_PROTOCOL = "chainreaction.json"
+BINARY_PROTOCOL = "chainreaction.binary.v1"
+# Server preference, best first
+SUPPORTED_PROTOCOLS = (BINARY_PROTOCOL, JSON_PROTOCOL)
+
+# First byte of every binary frame
+NEW_GAME_STATE = 1
+INCREMENT_CELL = 2
+GET_GAME_STATE = 3
+
+# Board action frames: message type, event sequence number (0 on increment_cell replies),
+# action count, then per action row, col and a byte holding the color in the low 7 bits
+# and an exploded flag in the high bit
+ACTIONS_HEADER = struct.Struct("<BII")
+ACTION = struct.Struct("BBB")
+EXPLODED_FLAG = 0x80
+# Game state frames: message type, flags, turn number, player count, event stream id and
+# the sequence number the state is current as of, then Board.to_bytes
+GAME_STATE_HEADER = struct.Struct("<BBBBII")
+PLAYERS_TURN_FLAG = 0x01
+
+
+def negotiate(offered: list[str]) -> str | None:
+    """
+    Pick the subprotocol to accept from the ones the client offered, or None if it offered
+    none we speak, in which case the connection is accepted without one and uses JSON.
+    """
+    for protocol in SUPPORTED_PROTOCOLS:
+        if protocol in offered:
+            return protocol
+    return None
+
+
+def encode_board_actions(message_type: int, board_actions: list[BoardAction], seq: int = 0) -> bytes:
+    """
+    Pack board actions into a binary frame. Raises ValueError if a value does not fit.
+    """
+    frame = bytearray(ACTIONS_HEADER.pack(message_type, seq, len(board_actions)))
+    try:
+        for action in board_actions:
+            if action["color"] >= EXPLODED_FLAG:
+                raise ValueError("Color does not fit the binary format")
+            flag = EXPLODED_FLAG if action["action"] == "exploded" else 0
+            frame += ACTION.pack(action["row"], action["col"], action["color"] | flag)
+    except struct.error as e:
+        raise ValueError(str(e)) from e
+    return bytes(frame)
+
+
+def decode_board_actions(frame: bytes) -> tuple[int, int, list[BoardAction]]:
+    message_type, seq, count = ACTIONS_HEADER.unpack_from(frame)
+    board_actions = []
+    for row, col, packed in ACTION.iter_unpack(frame[ACTIONS_HEADER.size:ACTIONS_HEADER.size + count * ACTION.size]):
+        board_actions.append(BoardAction(
+            row=row,
+            col=col,
+            action="exploded" if packed & EXPLODED_FLAG else "increment",
+            color=packed & ~EXPLODED_FLAG
+        ))
+    return message_type, seq, board_actions
+
+
+def encode_game_state(
+    board: Board,
+    players_turn: bool,
+    player_turn_number: int,
+    num_players: int,
+    stream_id: int,
+    seq: int
+) -> bytes:
+    """
+    Pack a game state reply into a binary frame. Raises ValueError if a value does not fit.
+    """
+    try:
+        header = GAME_STATE_HEADER.pack(
+            GET_GAME_STATE,
+            PLAYERS_TURN_FLAG if players_turn else 0,
+            player_turn_number,
+            num_players,
+            stream_id,
+            seq
+        )
+    except struct.error as e:
+        raise ValueError(str(e)) from e
+    return header + board.to_bytes()
+
+
+def decode_game_state(frame: bytes) -> tuple[Board, bool, int, int, int, int]:
+    _, flags, player_turn_number, num_players, stream_id, seq = GAME_STATE_HEADER.unpack_from(frame)
+    board = Board.from_bytes(frame[GAME_STATE_HEADER.size:])
+    return board, bool(flags & PLAYERS_TURN_FLAG), player_turn_number, num_players, stream_id, seq
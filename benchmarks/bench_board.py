@@ -0,0 +1,205 @@
+"""
+Benchmarks for api/command/game_logic.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_board --output before.json
+    python -m benchmarks.bench_board --output after.json --compare before.json
+
+Boards are built through the JSON format and the public API only, so the same script runs
+against older engines; benchmarks of methods an engine does not have are skipped.
+"""
+from api.command.game_logic.board import Board
+
+from datetime import datetime, timezone
+from typing import Callable, Any
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import time
+
+try:
+    from api.command.game_logic.geometry import get_geometry
+except ImportError:
+    get_geometry = None
+
+DEFAULT_SIZES = ["6x9", "8x12", "10x10", "15x15", "20x20", "30x30"]
+
+
+def board_state(width: int, height: int, cell: Callable[[int, int], tuple[int, int | None]]) -> str:
+    """
+    A board in the JSON format of Board.serialize, with `cell(index, max_count)` giving the
+    count and color of each cell.
+    """
+    rows = []
+    for row in range(height):
+        cells = []
+        for col in range(width):
+            max_count = 3 - (col in (0, width - 1)) - (row in (0, height - 1))
+            count, color = cell(row * width + col, max_count)
+            cells.append({"count": count, "color": color, "max_count": max_count})
+        rows.append(cells)
+    return json.dumps(rows)
+
+
+def critical_state(width: int, height: int) -> str:
+    """
+    Every cell one dot short of exploding, all color 0 except one corner held by color 1
+    so the board is not already won. Any move by color 0 chains across the whole board.
+    """
+    return board_state(width, height, lambda index, max_count: (max_count, 1 if index == 0 else 0))
+
+
+def half_filled_state(width: int, height: int) -> str:
+    """
+    A mid-game board: alternating colors with one dot each, so a move never chains.
+    """
+    return board_state(
+        width, height, lambda index, _: (1, (index // 2) % 2) if index % 2 == 0 else (0, None)
+    )
+
+
+def fresh(state: str) -> Callable[[], Board]:
+    """
+    Setup returning a new board in `state`, copied from a template when the engine can copy boards.
+    """
+    template = Board.deserialize(state)
+    if hasattr(template, "copy"):
+        return template.copy
+    return lambda: Board.deserialize(state)
+
+
+def measure(setup: Callable[[], Any], run: Callable[[Any], Any], min_time: float, repeats: int) -> dict:
+    """
+    Time `run` on fresh `setup()` values only, and report the best of `repeats` rounds per call.
+    """
+    # Calibrate how many calls fit in min_time
+    calls = 1
+    while True:
+        elapsed = _time_calls(setup, run, calls)
+        if elapsed >= min_time / 10 or calls >= 1_000_000:
+            break
+        calls *= 10
+    calls = max(1, int(calls * (min_time / max(elapsed, 1e-9))))
+
+    rounds = [_time_calls(setup, run, calls) / calls for _ in range(repeats)]
+    return {
+        "calls": calls,
+        "best_us": min(rounds) * 1e6,
+        "median_us": statistics.median(rounds) * 1e6,
+    }
+
+
+def _time_calls(setup: Callable[[], Any], run: Callable[[Any], Any], calls: int) -> float:
+    total = 0.0
+    for _ in range(calls):
+        value = setup()
+        start = time.perf_counter()
+        run(value)
+        total += time.perf_counter() - start
+    return total
+
+
+def bench_size(width: int, height: int, min_time: float, repeats: int) -> dict[str, dict]:
+    center_row, center_col = height // 2, width // 2
+    empty = fresh(Board(width, height).serialize())
+    mid_game = fresh(half_filled_state(width, height))
+    critical = fresh(critical_state(width, height))
+    mid_game_board = mid_game()
+    json_state = mid_game_board.serialize()
+
+    cascade_actions = critical().inc_cell_count(center_row, center_col, 0) or []
+
+    results = {
+        "init": measure(lambda: None, lambda _: Board(width, height), min_time, repeats),
+    }
+    if get_geometry is not None:
+        def cold_init(_: None) -> None:
+            get_geometry.cache_clear()
+            Board(width, height)
+
+        results["init_cold_geometry"] = measure(lambda: None, cold_init, min_time, repeats)
+    results.update({
+        "inc_single_cell": measure(
+            empty, lambda board: board.inc_cell_count(center_row, center_col, 0), min_time, repeats
+        ),
+        "inc_single_cell_mid_game": measure(
+            mid_game, lambda board: board.inc_cell_count(center_row, center_col + 1, 0), min_time, repeats
+        ),
+        "inc_cascade": measure(
+            critical, lambda board: board.inc_cell_count(center_row, center_col, 0), min_time, repeats
+        ),
+        "is_complete": measure(lambda: mid_game_board, lambda board: board.is_complete(), min_time, repeats),
+        "serialize": measure(lambda: mid_game_board, lambda board: board.serialize(), min_time, repeats),
+        "deserialize": measure(lambda: json_state, Board.deserialize, min_time, repeats),
+    })
+    if hasattr(Board, "to_state"):
+        binary_state = mid_game_board.to_state()
+        results["to_state"] = measure(lambda: mid_game_board, lambda board: board.to_state(), min_time, repeats)
+        results["from_state"] = measure(lambda: binary_state, Board.from_state, min_time, repeats)
+    if hasattr(Board, "copy"):
+        results["copy"] = measure(lambda: mid_game_board, lambda board: board.copy(), min_time, repeats)
+    results["inc_cascade"]["explosions"] = sum(1 for action in cascade_actions if action["action"] == "exploded")
+    return results
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(report: dict, baseline: dict | None) -> None:
+    for size, benchmarks in report["results"].items():
+        print(size)
+        for name, result in benchmarks.items():
+            line = f"  {name:<26} {result['best_us']:>12,.2f} us"
+            old = (baseline or {}).get("results", {}).get(size, {}).get(name)
+            if old:
+                line += f"   {old['best_us'] / result['best_us']:>6.2f}x vs baseline"
+            print(line)
+        print()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the board engine.")
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES, help="Board sizes as WIDTHxHEIGHT")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per timing round")
+    parser.add_argument("--repeats", type=int, default=5, help="Timing rounds per benchmark")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    args = parser.parse_args()
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "min_time": args.min_time,
+            "repeats": args.repeats,
+        },
+        "results": {},
+    }
+    for size in args.sizes:
+        width, height = (int(value) for value in size.lower().split("x"))
+        report["results"][size] = bench_size(width, height, args.min_time, args.repeats)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+    print_results(report, baseline)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Initial schema, as created by SQLModel.metadata.create_all before migrations existed
+
+Databases created that way can be marked as migrated with `alembic stamp 0001`, even if
+they were created from models that already had the columns and tables of 0002.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "GAME",
+        sa.Column("id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("code", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("board_width", sa.Integer(), nullable=False),
+        sa.Column("board_height", sa.Integer(), nullable=False),
+        sa.Column("started", sa.Boolean(), nullable=False),
+        sa.Column("complete", sa.Boolean(), nullable=False),
+        sa.Column("turn_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("modified_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "PLAYER",
+        sa.Column("id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("email", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("modified_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("email"),
+    )
+    op.create_table(
+        "GAME_STATE",
+        sa.Column("id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("game_id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("state", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["game_id"], ["GAME.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "GAME_PLAYER",
+        sa.Column("game_id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("player_id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("modified_at", sa.DateTime(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["game_id"], ["GAME.id"]),
+        sa.ForeignKeyConstraint(["player_id"], ["PLAYER.id"]),
+        sa.PrimaryKeyConstraint("game_id", "player_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("GAME_PLAYER")
+    op.drop_table("GAME_STATE")
+    op.drop_table("PLAYER")
+    op.drop_table("GAME")
@@ -0,0 +1,52 @@
+"""Snapshot turn, GAME_MOVE log and bot players
+
+The models gained these before migrations existed, so a database created from them with
+SQLModel.metadata.create_all may already have some of them. After `alembic stamp 0001`
+such a database upgrades normally: whatever is already there is left alone.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not _has_column(inspector, "GAME_STATE", "turn"):
+        op.add_column("GAME_STATE", sa.Column("turn", sa.Integer(), nullable=False, server_default="0"))
+    if not _has_column(inspector, "PLAYER", "is_bot"):
+        op.add_column("PLAYER", sa.Column("is_bot", sa.Boolean(), nullable=False, server_default=sa.false()))
+    if inspector.has_table("GAME_MOVE"):
+        return
+    op.create_table(
+        "GAME_MOVE",
+        sa.Column("game_id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("turn", sa.Integer(), nullable=False),
+        sa.Column("row", sa.Integer(), nullable=False),
+        sa.Column("col", sa.Integer(), nullable=False),
+        sa.Column("color", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["game_id"], ["GAME.id"]),
+        sa.PrimaryKeyConstraint("game_id", "turn"),
+    )
+
+
+def _has_column(inspector: sa.Inspector, table: str, column: str) -> bool:
+    return any(existing["name"] == column for existing in inspector.get_columns(table))
+
+
+def downgrade() -> None:
+    op.drop_table("GAME_MOVE")
+    op.drop_column("PLAYER", "is_bot")
+    op.drop_column("GAME_STATE", "turn")
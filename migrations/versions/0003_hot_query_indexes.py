@@ -0,0 +1,31 @@
+"""Indexes for the latest-state, player-order and join-by-code lookups
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Latest snapshot per game: ORDER BY created_at DESC LIMIT 1
+    op.create_index("ix_GAME_STATE_game_id_created_at", "GAME_STATE", ["game_id", sa.text("created_at DESC")])
+    # Player turn order within a game
+    op.create_index("ix_GAME_PLAYER_game_id_created_at", "GAME_PLAYER", ["game_id", "created_at"])
+    # Joining by code. CreateGameCommand already only hands out unused codes.
+    op.create_index("ix_GAME_code", "GAME", ["code"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_GAME_code", table_name="GAME")
+    op.drop_index("ix_GAME_PLAYER_game_id_created_at", table_name="GAME_PLAYER")
+    op.drop_index("ix_GAME_STATE_game_id_created_at", table_name="GAME_STATE")
@@ -0,0 +1,50 @@
+"""Persisted GAME_PLAYER.turn_order and GAME.player_count
+
+Replaces the row_number() window over GAME_PLAYER that every move used to run.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("GAME", sa.Column("player_count", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("GAME_PLAYER", sa.Column("turn_order", sa.Integer(), nullable=False, server_default="0"))
+
+    # Existing players keep the order they joined in; player_id breaks ties on created_at
+    # so every player of a game gets a distinct turn_order
+    op.execute(
+        'UPDATE "GAME_PLAYER" SET turn_order = ('
+        ' SELECT count(*) FROM "GAME_PLAYER" AS earlier'
+        ' WHERE earlier.game_id = "GAME_PLAYER".game_id'
+        ' AND (earlier.created_at < "GAME_PLAYER".created_at'
+        ' OR (earlier.created_at = "GAME_PLAYER".created_at AND earlier.player_id < "GAME_PLAYER".player_id))'
+        ')'
+    )
+    op.execute(
+        'UPDATE "GAME" SET player_count = ('
+        ' SELECT count(*) FROM "GAME_PLAYER" WHERE "GAME_PLAYER".game_id = "GAME".id'
+        ')'
+    )
+
+    # Turn order lookups now go through (game_id, turn_order) instead
+    op.drop_index("ix_GAME_PLAYER_game_id_created_at", table_name="GAME_PLAYER")
+    op.create_index("ix_GAME_PLAYER_game_id_turn_order", "GAME_PLAYER", ["game_id", "turn_order"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_GAME_PLAYER_game_id_turn_order", table_name="GAME_PLAYER")
+    op.create_index("ix_GAME_PLAYER_game_id_created_at", "GAME_PLAYER", ["game_id", "created_at"])
+    op.drop_column("GAME_PLAYER", "turn_order")
+    op.drop_column("GAME", "player_count")
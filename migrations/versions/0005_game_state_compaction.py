@@ -0,0 +1,41 @@
+"""GAME_STATE_ARCHIVE and GAME.compacted_at for compacting finished games
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("GAME", sa.Column("compacted_at", sa.DateTime(), nullable=True))
+    op.create_index(
+        "ix_GAME_uncompacted", "GAME", ["id"],
+        postgresql_where=sa.text("complete AND compacted_at IS NULL")
+    )
+    op.create_table(
+        "GAME_STATE_ARCHIVE",
+        sa.Column("game_id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("history", sa.LargeBinary(), nullable=False),
+        sa.Column("state_count", sa.Integer(), nullable=False),
+        sa.Column("move_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["game_id"], ["GAME.id"]),
+        sa.PrimaryKeyConstraint("game_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("GAME_STATE_ARCHIVE")
+    op.drop_index("ix_GAME_uncompacted", table_name="GAME")
+    op.drop_column("GAME", "compacted_at")
@@ -0,0 +1,25 @@
+"""Index for looking up a player's active game on connect
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A player's newest game: WHERE player_id = ? ORDER BY created_at DESC LIMIT 1
+    op.create_index("ix_GAME_PLAYER_player_id_created_at", "GAME_PLAYER", ["player_id", sa.text("created_at DESC")])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_GAME_PLAYER_player_id_created_at", table_name="GAME_PLAYER")
@@ -11,8 +11,11 @@ from api.rest_api import RestAPI
 # Make sure DATABASE_URL is set in your environment
 DATABASE_URL = os.environ["DATABASE_URL"]
 
+# Optional comma-separated read replicas for lag-tolerant reads
+DATABASE_REPLICA_URLS = [url for url in os.environ.get("DATABASE_REPLICA_URLS", "").split(",") if url]
+
 # Initialize database service
-database_service = SQLModelDatabaseService(DATABASE_URL)
+database_service = SQLModelDatabaseService(DATABASE_URL, DATABASE_REPLICA_URLS)
 
 # Create FastAPI app
 app = FastAPI()
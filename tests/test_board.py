@@ -0,0 +1,161 @@
+from api.command.game_logic.board import Board, MAX_PLAYERS
+
+import json
+import pytest
+
+# A cell as (count, color), or None for an empty cell
+Grid = list[list[tuple[int, int] | None]]
+
+
+def make_board(grid: Grid) -> Board:
+    """
+    Build a board through the JSON format, the way boards come out of the database.
+    """
+    height, width = len(grid), len(grid[0])
+    data = [
+        [
+            {
+                "count": cell[0] if cell else 0,
+                "color": cell[1] if cell else None,
+                "max_count": 3 - (col in (0, width - 1)) - (row in (0, height - 1)),
+            }
+            for col, cell in enumerate(cells)
+        ]
+        for row, cells in enumerate(grid)
+    ]
+    return Board.deserialize(json.dumps(data))
+
+
+def to_grid(board: Board) -> Grid:
+    return [
+        [(cell["count"], cell["color"]) if cell["count"] else None for cell in cells]
+        for cells in json.loads(board.serialize())
+    ]
+
+
+def critical_board() -> Board:
+    """
+    4x4 board with every cell one dot short of exploding, all color 0 but one corner of color 1.
+    """
+    return make_board([
+        [(3 - (col in (0, 3)) - (row in (0, 3)), 1 if (row, col) == (3, 3) else 0) for col in range(4)]
+        for row in range(4)
+    ])
+
+
+def assert_totals_consistent(board: Board) -> None:
+    # The running totals and the hash must match a board rebuilt from the cells alone
+    rebuilt = Board.deserialize(board.serialize())
+    assert board.num_colors == rebuilt.num_colors
+    assert board.total_count == rebuilt.total_count
+    assert board.zobrist_hash == rebuilt.zobrist_hash
+
+
+def actions_of(actions: list) -> list[tuple[int, int, str]]:
+    return [(action["row"], action["col"], action["action"]) for action in actions]
+
+
+def test_increment_without_explosion():
+    board = make_board([[None, None], [None, None]])
+
+    actions = board.inc_cell_count(0, 1, 1)
+
+    assert actions_of(actions) == [(0, 1, "increment")]
+    assert to_grid(board) == [[None, (1, 1)], [None, None]]
+    assert_totals_consistent(board)
+
+
+def test_explosion_chains_and_captures():
+    board = make_board([
+        [(1, 0), (2, 1), None],
+        [None, (2, 1), None],
+        [(1, 0), None, (1, 1)],
+    ])
+
+    actions = board.inc_cell_count(0, 0, 0)
+
+    assert actions_of(actions) == [(0, 0, "increment"), (0, 0, "exploded"), (0, 1, "exploded")]
+    assert to_grid(board) == [
+        [(1, 0), None, (1, 0)],
+        [(1, 0), (3, 0), None],
+        [(1, 0), None, (1, 1)],
+    ]
+    assert not board.is_complete()
+    assert_totals_consistent(board)
+
+
+def test_cell_of_another_color_is_refused():
+    grid = [[(1, 0), None], [None, (1, 1)]]
+    board = make_board(grid)
+
+    assert board.inc_cell_count(1, 1, 0) is None
+    assert to_grid(board) == grid
+
+
+def test_budget_cuts_the_chain_off():
+    board = critical_board()
+
+    actions = board.inc_cell_count(1, 1, 0, budget=1)
+
+    # Only the played cell was resolved; the hits it queued on its neighbors are dropped
+    assert actions_of(actions) == [(1, 1, "increment"), (1, 1, "exploded")]
+    assert to_grid(board) == [
+        [(1, 0), (2, 0), (2, 0), (1, 0)],
+        [(2, 0), None, (3, 0), (2, 0)],
+        [(2, 0), (3, 0), (3, 0), (2, 0)],
+        [(1, 0), (2, 0), (2, 0), (1, 1)],
+    ]
+    assert_totals_consistent(board)
+
+
+def test_budget_counts_every_hit():
+    board = critical_board()
+
+    actions = board.inc_cell_count(1, 1, 0, budget=5)
+
+    assert actions_of(actions) == [
+        (1, 1, "increment"),
+        (1, 1, "exploded"),
+        (2, 1, "exploded"),
+        (0, 1, "exploded"),
+        (1, 2, "exploded"),
+        (1, 0, "exploded"),
+    ]
+    assert_totals_consistent(board)
+
+
+def test_win_stops_the_cascade():
+    # Every cell of a 2x2 board explodes at two dots, so without the win check the chain
+    # would bounce between them forever
+    board = make_board([[(1, 0), (1, 1)], [(1, 0), (1, 0)]])
+
+    actions = board.inc_cell_count(0, 0, 0)
+
+    assert actions_of(actions) == [
+        (0, 0, "increment"),
+        (0, 0, "exploded"),
+        (1, 0, "exploded"),
+        (0, 1, "exploded"),
+    ]
+    assert to_grid(board) == [[(1, 0), None], [None, (1, 0)]]
+    assert board.is_complete()
+    assert_totals_consistent(board)
+
+
+def test_binary_round_trip_with_every_color():
+    board = make_board([
+        [(1, color) if color < MAX_PLAYERS else None for color in range(row * 4, row * 4 + 4)]
+        for row in range(4)
+    ])
+    assert board.num_colors == MAX_PLAYERS == 15
+
+    restored = Board.from_bytes(board.to_bytes())
+
+    assert restored.serialize() == board.serialize()
+    assert restored.zobrist_hash == board.zobrist_hash
+    assert Board.from_state(board.to_state()).serialize() == board.serialize()
+
+
+def test_color_beyond_the_binary_format_is_refused():
+    with pytest.raises(ValueError):
+        make_board([[(1, MAX_PLAYERS), None]])